@@ -2,6 +2,24 @@ import os
 
 AXE_SCRIPT_URL = "https://cdnjs.cloudflare.com/ajax/libs/axe-core/4.8.4/axe.min.js"
 
+# Tags passed to axe.run(runOnly). axe-core tags are not cumulative (rules
+# tagged "wcag2a" do not carry "wcag22aa"), so each WCAG level is listed.
+DEFAULT_AXE_TAGS = (
+    "wcag2a",
+    "wcag2aa",
+    "wcag21aa",
+    "wcag22aa",
+    "reflow",
+    "language",
+    "navigation",
+    "contrast",
+    "keyboard",
+    "focus",
+    "text-spacing",
+    "viewport",
+    "zoom",
+)
+
 IMAGE_DOMAIN_BLACKLIST = [
     "openstreetmap.org",
 ]
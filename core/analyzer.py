@@ -6,22 +6,143 @@ loading the script into the page, handling SSL warnings, supporting basic
 dynamic content interactions and performing multi‑state scans.
 """
 
+import hashlib
+import json
+import os
+import queue
+import random
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 
-from config.constants import AXE_SCRIPT_URL
+from config.constants import AXE_SCRIPT_URL, CACHE_DIR, DEFAULT_AXE_TAGS
 from core.dynamic_handler import DynamicContentHandler
+from core.webdriver_setup import setup_driver
 
 # Retry and timing configuration
 MAX_RETRIES = 3
 INITIAL_RETRY_DELAY = 5
+MAX_RETRY_DELAY = 10
+DRIVER_HEALTH_POLL_INTERVAL = 0.25
 PAGE_LOAD_WAIT_TIME = 5
 SSL_WARNING_WAIT_TIME = 3
+SSL_CONTROL_WAIT_TIME = 2
+AXE_DOWNLOAD_TIMEOUT = 30
+
+# Shared HTTP session so repeated downloads reuse pooled keep-alive connections.
+_http_session = requests.Session()
+_http_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# Evaluated in the browser so the page source never has to be serialised.
+_SSL_WARNING_PROBE_JS = """
+const title = (document.title || '').toLowerCase();
+const html = document.documentElement
+    ? document.documentElement.outerHTML.toLowerCase()
+    : '';
+return /privacidad|privacy/.test(title)
+    || /certificado|certificate|no es privada|not private/.test(html);
+"""
+
+# Text-based lookups run in the browser, where case-insensitive matching is
+# native, instead of XPath 1.0 translate() case folding.
+_FIND_ADVANCED_BUTTON_JS = (
+    "return Array.from(document.querySelectorAll('button'))"
+    ".find(el => /avanzado|advanced/i.test(el.textContent)) || null;"
+)
+_FIND_PROCEED_LINK_BY_TEXT_JS = (
+    "return Array.from(document.querySelectorAll('a'))"
+    ".find(el => /continuar|proceed/i.test(el.textContent)) || null;"
+)
+# Evaluates the XPath in arguments[0] and returns the first <button> and the
+# first <a> it matched (either may be null).
+_FIND_NAVIGATION_WARNING_CONTROLS_JS = """
+const snapshot = document.evaluate(
+    arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+let advanced = null;
+let proceed = null;
+for (let i = 0; i < snapshot.snapshotLength; i++) {
+    const el = snapshot.snapshotItem(i);
+    const tag = el.tagName.toLowerCase();
+    if (tag === 'button' && advanced === null) advanced = el;
+    else if (tag === 'a' && proceed === null) proceed = el;
+}
+return [advanced, proceed];
+"""
+
+# XPath locators for browser SSL interstitials.
+_XPATH_ADVANCED_BUTTON = (
+    "//button[contains(text(), 'Avanzado') or contains(text(), 'Advanced')]"
+)
+_XPATH_PROCEED_LINK = "//a[contains(@id, 'proceed') or contains(@href, 'proceed')]"
+_XPATH_NAVIGATION_PROCEED_LINK = (
+    "//a[contains(text(), 'Continuar') or contains(text(), 'Proceed') "
+    "or contains(text(), 'Ir a')]"
+)
+_XPATH_NAVIGATION_PROCEED_ID_LINK = (
+    "//a[contains(@id, 'proceed-link') or contains(@href, 'proceed')]"
+)
+_XPATH_NAVIGATION_WARNING_CONTROLS = (
+    f"{_XPATH_ADVANCED_BUTTON} | {_XPATH_NAVIGATION_PROCEED_LINK}"
+)
+
+
+@lru_cache(maxsize=1)
+def _get_axe_script(script_url: str = AXE_SCRIPT_URL) -> str:
+    """
+    Return the axe-core source, downloading it at most once per URL.
+
+    The script is memoised in memory for the lifetime of the process and
+    persisted under ``CACHE_DIR`` (keyed by a hash of the URL, which already
+    pins the axe-core version) so later runs can skip the download entirely.
+    The cache file is replaced atomically; an empty or unreadable one is
+    treated as a miss and downloaded again.
+    """
+    url_hash = hashlib.sha256(script_url.encode("utf-8")).hexdigest()[:16]
+    cache_path = os.path.join(CACHE_DIR, f"axe-{url_hash}.min.js")
+
+    try:
+        with open(cache_path, "r", encoding="utf-8") as cached:
+            cached_script = cached.read()
+        if cached_script.strip():
+            return cached_script
+    except (OSError, UnicodeDecodeError):
+        pass
+
+    response = _http_session.get(script_url, timeout=AXE_DOWNLOAD_TIMEOUT)
+    response.raise_for_status()
+    axe_script = response.text
+
+    tmp_path = None
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Unique temp file + os.replace: concurrent runs never see a partial script
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, prefix=f"axe-{url_hash}.", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as cached:
+            cached.write(axe_script)
+        os.replace(tmp_path, cache_path)
+        tmp_path = None
+    except OSError as exc:
+        print(f"  ⚠️ Could not persist axe-core script to cache: {exc}")
+    finally:
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    return axe_script
 
 
 def _handle_ssl_warning(driver: WebDriver, target: str) -> None:
@@ -29,22 +150,14 @@ def _handle_ssl_warning(driver: WebDriver, target: str) -> None:
     Try to automatically bypass common SSL browser warning pages.
     """
     try:
-        page_title = driver.title.lower()
-        page_source = driver.page_source.lower()
-        ssl_indicators = (
-            "privacidad" in page_title
-            or "privacy" in page_title
-            or "certificado" in page_source
-            or "certificate" in page_source
-            or "no es privada" in page_source
-            or "not private" in page_source
-        )
+        ssl_indicators = driver.execute_script(_SSL_WARNING_PROBE_JS)
 
         if not ssl_indicators:
             return
 
         print("  ⚠️ SSL warning page detected, attempting to continue...")
 
+        warning_root = driver.find_element(By.TAG_NAME, "html")
         strategies = [
             lambda: driver.find_element(By.ID, "proceed-link").click(),
             lambda: _click_advanced_then_proceed(driver),
@@ -57,7 +170,7 @@ def _handle_ssl_warning(driver: WebDriver, target: str) -> None:
         for strategy in strategies:
             try:
                 strategy()
-                time.sleep(SSL_WARNING_WAIT_TIME)
+                _wait_for_navigation(driver, warning_root, SSL_WARNING_WAIT_TIME)
                 return
             except Exception:
                 continue
@@ -69,85 +182,208 @@ def _handle_ssl_warning(driver: WebDriver, target: str) -> None:
         )
 
 
+def _find_element_by_script(driver: WebDriver, script: str) -> WebElement:
+    """Return the element located by ``script`` or raise NoSuchElementException."""
+    element = driver.execute_script(script)
+    if element is None:
+        raise NoSuchElementException("No element matched the lookup script")
+    return element
+
+
 def _click_advanced_then_proceed(driver: WebDriver) -> None:
     """Click the 'Advanced' button and then a 'proceed' link, if present."""
-    advanced = driver.find_element(
-        By.XPATH,
-        "//button[contains(text(), 'Avanzado') or contains(text(), 'Advanced')]",
-    )
+    advanced = _find_element_by_script(driver, _FIND_ADVANCED_BUTTON_JS)
     advanced.click()
-    time.sleep(2)
-    proceed = driver.find_element(
-        By.XPATH,
-        "//a[contains(@id, 'proceed') or contains(@href, 'proceed')]",
+    proceed = WebDriverWait(driver, SSL_CONTROL_WAIT_TIME).until(
+        EC.element_to_be_clickable((By.XPATH, _XPATH_PROCEED_LINK))
     )
     proceed.click()
 
 
 def _click_proceed_link_by_text(driver: WebDriver) -> None:
     """Find and click a link that contains 'continuar' or 'proceed'."""
-    proceed = driver.find_element(
-        By.XPATH,
-        "//a[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'continuar') or "
-        "contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'proceed')]",
-    )
+    proceed = _find_element_by_script(driver, _FIND_PROCEED_LINK_BY_TEXT_JS)
     proceed.click()
 
 
 def _handle_navigation_ssl_warning(driver: WebDriver) -> None:
     """Handle SSL warnings that appear during initial navigation."""
     try:
-        advanced_buttons = driver.find_elements(
-            By.XPATH,
-            "//button[contains(text(), 'Avanzado') or contains(text(), 'Advanced')]",
-        )
-        proceed_buttons = driver.find_elements(
-            By.XPATH,
-            "//a[contains(text(), 'Continuar') or contains(text(), 'Proceed') or contains(text(), 'Ir a')]",
+        # One round-trip for both kinds of control, classified in the page.
+        advanced_button, proceed_button = driver.execute_script(
+            _FIND_NAVIGATION_WARNING_CONTROLS_JS, _XPATH_NAVIGATION_WARNING_CONTROLS
         )
 
-        if advanced_buttons:
-            advanced_buttons[0].click()
-            time.sleep(2)
-            proceed_links = driver.find_elements(
-                By.XPATH,
-                "//a[contains(@id, 'proceed-link') or contains(@href, 'proceed')]",
-            )
-            if proceed_links:
-                proceed_links[0].click()
-                time.sleep(2)
-        elif proceed_buttons:
-            proceed_buttons[0].click()
-            time.sleep(2)
+        if advanced_button is not None:
+            advanced_button.click()
+            try:
+                proceed_link = WebDriverWait(driver, SSL_CONTROL_WAIT_TIME).until(
+                    EC.element_to_be_clickable(
+                        (By.XPATH, _XPATH_NAVIGATION_PROCEED_ID_LINK)
+                    )
+                )
+            except TimeoutException:
+                return
+            warning_root = driver.find_element(By.TAG_NAME, "html")
+            proceed_link.click()
+            _wait_for_navigation(driver, warning_root, SSL_CONTROL_WAIT_TIME)
+        elif proceed_button is not None:
+            warning_root = driver.find_element(By.TAG_NAME, "html")
+            proceed_button.click()
+            _wait_for_navigation(driver, warning_root, SSL_CONTROL_WAIT_TIME)
     except Exception:
         # Failing to handle this automatically should not abort the analysis.
         pass
 
 
-def _execute_axe_analysis(driver: WebDriver) -> Dict[str, Any]:
+_AXE_CALLBACK_JS = "const callback = arguments[arguments.length - 1];"
+_CDP_BROWSER_NAMES = frozenset({"chrome", "chrome-headless-shell", "msedge", "MicrosoftEdge"})
+
+
+@lru_cache(maxsize=8)
+def _build_axe_options_json(tags: Tuple[str, ...]) -> str:
     """
-    Inject axe-core into the page and execute an accessibility scan.
+    Return the axe.run options object restricted to ``tags``.
 
-    Returns:
-        The raw results object produced by axe.run(...)
+    The options are serialised with ``json.dumps`` so arbitrary tag names are
+    quoted correctly, and the result is cached per tag tuple.
     """
-    axe_script = requests.get(AXE_SCRIPT_URL).text
-    driver.execute_script(axe_script)
+    return json.dumps(
+        {"runOnly": {"type": "tag", "values": list(tags)}},
+        separators=(",", ":"),
+    )
 
-    return driver.execute_async_script(
-        "const callback = arguments[arguments.length - 1];"
-        "axe.run({ runOnly: { type: 'tag', values: ['wcag2a', 'wcag2aa', 'wcag21aa', 'wcag22aa', 'reflow', 'language', 'navigation', 'contrast', 'keyboard', 'focus', 'text-spacing', 'viewport', 'zoom'] } })"
+
+@lru_cache(maxsize=8)
+def _build_axe_run_js(tags: Tuple[str, ...]) -> str:
+    """Return the axe.run(...) snippet that reports through the async callback."""
+    return (
+        f"axe.run({_build_axe_options_json(tags)})"
         ".then(results => callback(results))"
         ".catch(err => callback({ error: err.toString() }));"
     )
 
 
+@lru_cache(maxsize=8)
+def _build_axe_run_if_loaded_js(tags: Tuple[str, ...]) -> str:
+    """Return the run script, resolving to null when axe-core is not loaded yet."""
+    return (
+        _AXE_CALLBACK_JS
+        + "if (typeof window.axe === 'undefined') { callback(null); return; }"
+        + _build_axe_run_js(tags)
+    )
+
+
+@lru_cache(maxsize=8)
+def _get_axe_inject_and_run_js(tags: Tuple[str, ...]) -> str:
+    """Return a single async script that injects axe-core and runs it."""
+    return f"{_AXE_CALLBACK_JS}\n{_get_axe_script()}\n{_build_axe_run_js(tags)}"
+
+
+@lru_cache(maxsize=8)
+def _build_axe_run_expression(tags: Tuple[str, ...]) -> str:
+    """Return a CDP expression evaluating to the axe.run(...) promise."""
+    return (
+        f"axe.run({_build_axe_options_json(tags)})"
+        ".catch(err => ({ error: err.toString() }))"
+    )
+
+
+@lru_cache(maxsize=8)
+def _build_axe_run_if_loaded_expression(tags: Tuple[str, ...]) -> str:
+    """Return the CDP run expression, evaluating to null when axe-core is not loaded."""
+    return (
+        "(typeof window.axe === 'undefined') ? null : "
+        + _build_axe_run_expression(tags)
+    )
+
+
+@lru_cache(maxsize=8)
+def _get_axe_inject_and_run_expression(tags: Tuple[str, ...]) -> str:
+    """Return a CDP script that injects axe-core and evaluates to the run promise."""
+    return f"{_get_axe_script()}\n;{_build_axe_run_expression(tags)}"
+
+
+def _supports_cdp(driver: WebDriver) -> bool:
+    """Whether ``driver`` is Chromium-based and exposes ``execute_cdp_cmd``."""
+    browser_name = (getattr(driver, "capabilities", None) or {}).get("browserName")
+    return hasattr(driver, "execute_cdp_cmd") and browser_name in _CDP_BROWSER_NAMES
+
+
+def _evaluate_with_cdp(driver: WebDriver, expression: str) -> Any:
+    """Evaluate ``expression`` through Runtime.evaluate, awaiting its promise."""
+    response = driver.execute_cdp_cmd(
+        "Runtime.evaluate",
+        {
+            "expression": expression,
+            "awaitPromise": True,
+            "returnByValue": True,
+        },
+    )
+    if response.get("exceptionDetails"):
+        details = response["exceptionDetails"]
+        message = details.get("exception", {}).get("description") or details.get("text")
+        raise Exception(f"axe-core evaluation failed: {message}")
+    return response.get("result", {}).get("value")
+
+
+def _execute_axe_analysis(
+    driver: WebDriver,
+    tags: Sequence[str] = DEFAULT_AXE_TAGS,
+    fresh_document: bool = False,
+) -> Dict[str, Any]:
+    """
+    Inject axe-core into the page and execute an accessibility scan.
+
+    A freshly loaded document (``fresh_document``) cannot define
+    ``window.axe`` yet, so the combined inject-and-run script is sent directly
+    in one round-trip. Otherwise the run script is sent on its own first and
+    reports back ``null`` only when ``window.axe`` is missing; only then is
+    the inject-and-run script uploaded as a second call.
+
+    On Chromium-based drivers the scripts are evaluated directly through the
+    DevTools ``Runtime.evaluate`` command, skipping Selenium's async-script
+    callback plumbing; other browsers use ``execute_async_script``.
+
+    Args:
+        driver: Selenium WebDriver.
+        tags: axe-core tags to run; duplicates are dropped.
+        fresh_document: True right after a navigation, when ``window.axe``
+            cannot be defined yet and probing for it would be wasted.
+
+    Returns:
+        The raw results object produced by axe.run(...)
+    """
+    unique_tags = tuple(dict.fromkeys(tags))
+
+    if _supports_cdp(driver):
+        results = None
+        if not fresh_document:
+            results = _evaluate_with_cdp(
+                driver, _build_axe_run_if_loaded_expression(unique_tags)
+            )
+        if results is None:
+            results = _evaluate_with_cdp(
+                driver, _get_axe_inject_and_run_expression(unique_tags)
+            )
+        return results
+
+    results = None
+    if not fresh_document:
+        results = driver.execute_async_script(_build_axe_run_if_loaded_js(unique_tags))
+    if results is None:
+        results = driver.execute_async_script(_get_axe_inject_and_run_js(unique_tags))
+    return results
+
+
 def run_axe_analysis(
     driver: WebDriver,
     url: str,
     is_local_file: bool = False,
     enable_dynamic_interactions: bool = True,
     custom_interactions: Any = None,
+    axe_tags: Sequence[str] = DEFAULT_AXE_TAGS,
+    _skip_navigation: bool = False,
 ) -> Dict[str, Any]:
     """
     Run an axe-core accessibility analysis, with optional dynamic interactions.
@@ -159,6 +395,12 @@ def run_axe_analysis(
         enable_dynamic_interactions: If True, run basic dynamic interactions
             before executing axe (cookies, modals, simple scroll).
         custom_interactions: Optional list of caller‑defined interactions.
+        axe_tags: axe-core tags to run, for callers that only need a
+            partial scan.
+        _skip_navigation: Internal fast path for callers that already loaded
+            ``url`` in ``driver`` through ``_navigate`` (multi‑state scans);
+            the page is analysed in its current state instead of being
+            reloaded, so interactions applied after the load stay in effect.
 
     Returns:
         Raw axe-core results as a dict.
@@ -173,32 +415,62 @@ def run_axe_analysis(
             target = Path(url).resolve().as_uri() if is_local_file else url
             print(f"Running Axe analysis on: {target}")
 
-            try:
-                driver.get(target)
-            except Exception as nav_error:
-                print(f"  ⚠️ Navigation warning (possible SSL issue): {nav_error}")
-                _handle_navigation_ssl_warning(driver)
-
-            time.sleep(PAGE_LOAD_WAIT_TIME)
-            _handle_ssl_warning(driver, target)
+            if not _skip_navigation:
+                _navigate(driver, target, is_local_file)
 
             if enable_dynamic_interactions and not is_local_file:
                 _handle_dynamic_interactions(driver, custom_interactions)
 
             _wait_for_page_load(driver)
-            return _execute_axe_analysis(driver)
+            return _execute_axe_analysis(
+                driver, axe_tags, fresh_document=not _skip_navigation
+            )
         except Exception as exc:
             print(f"Attempt {attempt + 1} failed: {exc}")
             if attempt < MAX_RETRIES - 1:
-                print(f"Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-                retry_delay *= 2
+                # Jitter keeps parallel workers from retrying in lockstep.
+                backoff = retry_delay * (0.8 + 0.4 * random.random())
+                print(f"Retrying in up to {backoff:.1f} seconds...")
+                _wait_for_driver_recovery(driver, backoff)
+                retry_delay = min(retry_delay * 2, MAX_RETRY_DELAY)
             else:
                 raise Exception(
                     f"Could not complete analysis after {MAX_RETRIES} attempts"
                 ) from exc
 
 
+def _navigate(driver: WebDriver, target: str, is_local_file: bool) -> None:
+    """Load ``target``, bypass SSL interstitials for remote URLs and wait for the page."""
+    try:
+        driver.get(target)
+    except Exception as nav_error:
+        print(f"  ⚠️ Navigation warning (possible SSL issue): {nav_error}")
+        if not is_local_file:
+            _handle_navigation_ssl_warning(driver)
+
+    _wait_for_page_load(driver)
+    # file:// URIs never show certificate interstitials.
+    if not is_local_file:
+        _handle_ssl_warning(driver, target)
+
+
+def _wait_for_driver_recovery(driver: WebDriver, max_wait: float) -> None:
+    """
+    Back off for at most ``max_wait`` seconds, returning early once the driver responds.
+
+    A cheap ``return 1`` probe is polled so that transient failures on an
+    otherwise healthy driver are retried almost immediately instead of
+    blocking the worker for the whole backoff interval.
+    """
+    deadline = time.monotonic() + max_wait
+    while time.monotonic() < deadline:
+        try:
+            driver.execute_script("return 1")
+            return
+        except Exception:
+            time.sleep(DRIVER_HEALTH_POLL_INTERVAL)
+
+
 def _handle_dynamic_interactions(driver: WebDriver, custom_interactions: Any) -> None:
     """Execute built‑in and optional custom dynamic interactions."""
     try:
@@ -218,74 +490,173 @@ def _handle_dynamic_interactions(driver: WebDriver, custom_interactions: Any) ->
         print(f"Warning: error during dynamic interactions: {exc}")
 
 
-def _wait_for_page_load(driver: WebDriver) -> None:
-    """Wait for the page readyState to become 'complete'."""
-    ready_state = driver.execute_script("return document.readyState")
-    if ready_state != "complete":
-        print("Waiting for page to finish loading...")
-        time.sleep(PAGE_LOAD_WAIT_TIME)
+def _wait_for_page_load(driver: WebDriver, timeout: float = PAGE_LOAD_WAIT_TIME) -> None:
+    """
+    Wait until the page readyState becomes 'complete', at most ``timeout`` seconds.
+
+    Returns as soon as the document is ready instead of sleeping for a fixed
+    interval; a page that is still loading after the timeout is analysed
+    as-is, matching the previous best-effort behaviour.
+    """
+    try:
+        WebDriverWait(driver, timeout).until(
+            lambda d: d.execute_script("return document.readyState") == "complete"
+        )
+    except TimeoutException:
+        print("  ⚠️ Page did not finish loading in time, continuing anyway...")
+
+
+def _wait_for_navigation(
+    driver: WebDriver,
+    previous_root: WebElement,
+    timeout: float,
+) -> None:
+    """Wait for ``previous_root`` to be replaced by a new document, then for it to load."""
+    try:
+        WebDriverWait(driver, timeout).until(EC.staleness_of(previous_root))
+    except TimeoutException:
+        return
+    _wait_for_page_load(driver)
+
+
+def _analyse_state(
+    driver: WebDriver,
+    url: str,
+    index: int,
+    state_config: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Load ``url`` in ``driver``, apply one state's interactions and run axe-core.
+
+    The page is loaded once per state (with the usual SSL handling) and the
+    scan skips its own navigation, so the interactions are still in effect
+    when axe runs. Failures are returned as an error entry for the state.
+    """
+    state_name = state_config.get("name", f"State {index}")
+    print(f"\n--- Analysing state {index}: {state_name} ---")
+
+    try:
+        _navigate(driver, url, is_local_file=False)
+
+        if state_config.get("interactions"):
+            dynamic_handler = DynamicContentHandler(driver)
+            interaction_results = dynamic_handler.execute_custom_interactions(
+                state_config["interactions"]
+            )
+            print(
+                "Interactions executed: "
+                f"{len(interaction_results['successful'])} successful"
+            )
+
+        axe_results = run_axe_analysis(
+            driver,
+            url,
+            enable_dynamic_interactions=False,
+            _skip_navigation=True,
+        )
+
+        axe_results["state_info"] = {
+            "name": state_name,
+            "description": state_config.get("description", ""),
+            "interactions_applied": state_config.get("interactions", []),
+            "timestamp": time.time(),
+        }
+
+        print(f"✅ State '{state_name}' analysed successfully")
+        return axe_results
+
+    except Exception as exc:
+        print(f"❌ Error analysing state '{state_name}': {exc}")
+        return _state_error_result(index, state_config, exc)
+
+
+def _state_error_result(
+    index: int, state_config: Dict[str, Any], exc: BaseException
+) -> Dict[str, Any]:
+    """Build the per-state error entry returned in place of axe results."""
+    return {
+        "error": str(exc),
+        "state_info": {
+            "name": state_config.get("name", f"State {index}"),
+            "description": state_config.get("description", ""),
+            "timestamp": time.time(),
+        },
+    }
 
 
 def run_axe_analysis_multiple_states(
     driver: WebDriver,
     url: str,
     states_config: List[Dict[str, Any]],
+    max_workers: int = 1,
+    driver_factory: Optional[Callable[[], WebDriver]] = None,
 ) -> List[Dict[str, Any]]:
     """
     Run axe-core analysis on multiple interaction states of the same page.
 
     Each state can specify a name, description and a list of interactions
-    that are executed before the axe run.
+    that are executed before the axe run. Every state starts from a freshly
+    loaded page, so its results do not depend on the interactions of the
+    states before it or on ``max_workers``.
+
+    With ``max_workers > 1`` the states are dispatched concurrently over a
+    small pool of drivers: ``driver`` plus ``max_workers - 1`` extra drivers
+    created with ``driver_factory`` (``setup_driver`` by default) and quit
+    once the analysis finishes. Results keep the order of ``states_config``.
     """
-    results: List[Dict[str, Any]] = []
-    dynamic_handler = DynamicContentHandler(driver)
-
     print(f"🔄 Starting multi‑state analysis for: {url}")
 
-    driver.get(url)
-    time.sleep(PAGE_LOAD_WAIT_TIME)
-
-    for index, state_config in enumerate(states_config, 1):
-        state_name = state_config.get("name", f"State {index}")
-        print(f"\n--- Analysing state {index}: {state_name} ---")
+    workers = max(1, min(max_workers, len(states_config)))
 
-        try:
-            if state_config.get("interactions"):
-                interaction_results = dynamic_handler.execute_custom_interactions(
-                    state_config["interactions"]
-                )
-                print(
-                    "Interactions executed: "
-                    f"{len(interaction_results['successful'])} successful"
-                )
+    if workers == 1:
+        return [
+            _analyse_state(driver, url, index, state_config)
+            for index, state_config in enumerate(states_config, 1)
+        ]
 
-            axe_results = run_axe_analysis(
-                driver,
-                url,
-                enable_dynamic_interactions=False,
-            )
+    factory = driver_factory or setup_driver
+    extra_drivers: List[WebDriver] = []
+    pool: "queue.Queue[WebDriver]" = queue.Queue()
 
-            axe_results["state_info"] = {
-                "name": state_name,
-                "description": state_config.get("description", ""),
-                "interactions_applied": state_config.get("interactions", []),
-                "timestamp": time.time(),
+    try:
+        pool.put(driver)
+        for _ in range(workers - 1):
+            try:
+                extra_driver = factory()
+            except Exception as exc:
+                print(f"  ⚠️ Could not start additional driver: {exc}")
+                break
+            extra_drivers.append(extra_driver)
+            pool.put(extra_driver)
+
+        def analyse_with_pooled_driver(
+            index: int, state_config: Dict[str, Any]
+        ) -> Dict[str, Any]:
+            # Never raise through as_completed: one bad state must not
+            # discard the results of the others.
+            pooled_driver = pool.get()
+            try:
+                return _analyse_state(pooled_driver, url, index, state_config)
+            except Exception as exc:
+                print(f"❌ Error analysing state {index}: {exc}")
+                return _state_error_result(index, state_config, exc)
+            finally:
+                pool.put(pooled_driver)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(states_config)
+        with ThreadPoolExecutor(max_workers=1 + len(extra_drivers)) as executor:
+            futures = {
+                executor.submit(analyse_with_pooled_driver, index, state_config): index
+                for index, state_config in enumerate(states_config, 1)
             }
+            for future in as_completed(futures):
+                results[futures[future] - 1] = future.result()
 
-            results.append(axe_results)
-            print(f"✅ State '{state_name}' analysed successfully")
-
-        except Exception as exc:
-            print(f"❌ Error analysing state '{state_name}': {exc}")
-            results.append(
-                {
-                    "error": str(exc),
-                    "state_info": {
-                        "name": state_name,
-                        "description": state_config.get("description", ""),
-                        "timestamp": time.time(),
-                    },
-                }
-            )
+        return [result for result in results if result is not None]
 
-    return results
+    finally:
+        for extra_driver in extra_drivers:
+            try:
+                extra_driver.quit()
+            except Exception:
+                pass
@@ -11,16 +11,49 @@ Business behaviour must remain stable; refactors focus on structure,
 type hints and documentation only.
 """
 
+import base64
+import hashlib
+import http.client
 import json
+import logging
+import mmap
+import os
+import re
+import shutil
+import socket
 import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from collections import defaultdict
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-from utils.io_utils import log_openai_call
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is an optional speed-up
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional speed-up
+    orjson = None
+
+from config.constants import CACHE_DIR
+from utils.io_utils import log_openai_call, read_json_file, write_json_file
 from core.webdriver_setup import setup_driver
 from core.analyzer import run_axe_analysis
 from core.screenshot_handler import take_screenshots, create_screenshot_summary
 
+logger = logging.getLogger(__name__)
+
 ANGULAR_CONFIG_FILE = "angular.json"
 
 # Feature flag for automatic contrast corrections in Angular.
@@ -30,6 +63,483 @@ ANGULAR_CONFIG_FILE = "angular.json"
 # this remains disabled by default.
 ENABLE_AUTOMATIC_CONTRAST_FIXES = False
 
+# Set DEBUG_DIFF=1 to print a line-by-line comparison when the sandbox sees
+# no difference between a template and its LLM-corrected version.
+DEBUG_DIFF = os.getenv("DEBUG_DIFF", "").lower() in ("1", "true", "yes")
+
+# Components with no statically detected errors and no Axe errors skip the
+# LLM call. Set FORCE_LLM_SCAN=1 to send every component for full-coverage audits.
+FORCE_LLM_SCAN = os.getenv("FORCE_LLM_SCAN", "").lower() in ("1", "true", "yes")
+
+# Sandbox LLM responses are persisted under CACHE_DIR, keyed by a hash of the
+# full request (screenshots included), so re-running an unchanged project does
+# not pay for the same completions again. Set ANGULAR_LLM_CACHE=0 to disable.
+ENABLE_LLM_DISK_CACHE = os.getenv("ANGULAR_LLM_CACHE", "1").lower() not in ("0", "false", "no")
+
+# Precompiled patterns shared by the Axe → template mapping helpers.
+# Group 1: Angular runtime attribute with its leading whitespace; otherwise a whitespace run.
+_NG_NORMALIZE_RE = re.compile(
+    r'(\s+(?:_ngcontent-[^= ]*|_nghost-[^= ]*|ng-reflect-[\w-]+)="[^"]*")|\s+'
+)
+_TAG_RE = re.compile(r"<(\w+)")
+_SELECTOR_CLASS_RE = re.compile(r"\.([a-zA-Z0-9_-]+)")
+_SELECTOR_ID_RE = re.compile(r"#([a-zA-Z0-9_-]+)")
+_SELECTOR_ELEMENT_RE = re.compile(r"^([a-zA-Z][a-zA-Z0-9-]*)(?=[\.#\s>+~:\[\]()]|$)")
+_ELEMENT_NAME_RE = re.compile(r"<([a-zA-Z][a-zA-Z0-9-]*)")
+_ID_ATTR_RE = re.compile(r"""id=(?:"([^"]*)"|'([^']*)')""")
+_WORD_TOKEN_RE = re.compile(r"[\w-]+")
+# Patterns used to validate and diff LLM-corrected templates.
+_WS_RE = re.compile(r"\s+")
+_DIFF_RE = re.compile(
+    r'(?P<label><label[^>]*>)'
+    r'|(?P<aria>aria-\w+="[^"]*")'
+    r'|(?P<alt>alt="[^"]*")'
+    r'|color\s*:\s*["\']?(?P<color>[^"\';]+)',
+    re.IGNORECASE,
+)
+# First ``` fenced block; group 1 is its body without the language line.
+_FENCE_RE = re.compile(r"```(?:(?:(?!```)[^\n])*\n)?((?:(?!```).)*)```", re.DOTALL)
+_INLINE_TEMPLATE_RE = re.compile(r"template\s*:\s*`([\s\S]*?)`", re.MULTILINE)
+_CSS_RULE_SELECTOR_RE = re.compile(r"([.#][a-zA-Z0-9_-]+)\s*\{")
+# Sandbox prompt formatting of Axe errors: contrast figures from failure
+# messages, Angular runtime attributes, button text and the fallback
+# <<<TEMPLATE>>> extraction.
+_RE_CONTRAST = re.compile(r'contrast of ([\d.]+)', re.IGNORECASE)
+_RE_EXPECTED = re.compile(r'Expected contrast ratio of ([\d.]+:?[\d]*)', re.IGNORECASE)
+_RE_FG = re.compile(r'foreground color: (#[0-9a-fA-F]+)', re.IGNORECASE)
+_RE_BG = re.compile(r'background color: (#[0-9a-fA-F]+)', re.IGNORECASE)
+_RE_NG_ATTR = re.compile(r'\s+_ng(?:content|host)-[^=]*="[^"]*"')
+_RE_BUTTON_TEXT = re.compile(r'>\s*([^<]+)\s*<')
+# Static template analysis (_analyze_template_for_accessibility_errors), applied per line.
+_BUTTON_OPEN_RE = re.compile(r'<button[^>]*>', re.IGNORECASE)
+_BUTTON_FULL_RE = re.compile(r'<button[^>]*>(.*?)</button>', re.DOTALL | re.IGNORECASE)
+_LINK_OPEN_RE = re.compile(r'<a[^>]*>', re.IGNORECASE)
+_LINK_FULL_RE = re.compile(r'<a[^>]*>(.*?)</a>', re.DOTALL | re.IGNORECASE)
+_INPUT_OPEN_RE = re.compile(r'<(input|select|textarea)[^>]*>', re.IGNORECASE)
+_INPUT_ID_RE = re.compile(r'\bid=["\']([^"\']+)["\']')
+_LABEL_OPEN_RE = re.compile(r'<label[^>]*>', re.IGNORECASE)
+_LABEL_FOR_RE = re.compile(r'\bfor=["\']([^"\']+)["\']')
+_IMG_OPEN_RE = re.compile(r'<img[^>]*>', re.IGNORECASE)
+_TEXT_ELEM_OPEN_RE = re.compile(r'<(p|a|span|div|h[1-6]|label|button)[^>]*>', re.IGNORECASE)
+_TEXT_ELEM_FULL_RE = re.compile(r'<(p|a|span|div|h[1-6]|label|button)[^>]*>(.*?)</\1>', re.DOTALL | re.IGNORECASE)
+# Interpolations, tags and *ngX="..." directives stripped to get visible text.
+_CLEAN_NG_RE = re.compile(r'\{[^}]*\}|<[^>]+>|\*ng[A-Za-z]*="[^"]*"')
+_CLEAN_TEXT_RE = re.compile(r'\{[^}]*\}|<[^>]+>')
+# Prefix of every tag opener above; lines without one can skip all the checks.
+_A11Y_TAG_HINT_RE = re.compile(r'<(?:a|button|img|input|select|textarea|label|p|span|div|h[1-6])', re.IGNORECASE)
+_GENERIC_LINK_TEXTS = frozenset(
+    ['click aquí', 'más', 'aquí', 'click here', 'more', 'here', 'more info', 'ver más', 'read more']
+)
+
+# Visually hidden labels guarded by _fix_responsive_breaking_changes.
+_HIDDEN_STYLE_LABEL_RE = re.compile(
+    r'<label[^>]*(?:style="[^"]*display\s*:\s*none[^"]*"|class="[^"]*visually-hidden[^"]*")[^>]*>.*?</label>',
+    re.DOTALL | re.IGNORECASE,
+)
+_HIDDEN_ATTR_LABEL_RE = re.compile(r'<label[^>]*hidden[^>]*>.*?</label>', re.DOTALL | re.IGNORECASE)
+_LABEL_CONTENT_RE = re.compile(r'<label[^>]*>(.*?)</label>', re.DOTALL)
+_FOR_DQ_RE = re.compile(r'for="([^"]+)"')
+
+# CSS rule (selector list + body) setting a text colour, for _analyze_css_for_contrast_issues.
+# Bodies cannot contain braces, so at-rule wrappers are skipped and the inner rule matches.
+_CSS_COLOR_RULE_RE = re.compile(
+    r'([^{};]+)\{[^{}]*?(?<![\w-])color\s*:\s*(#[0-9a-f]{3,8}|rgba?\([^)]+\))[^{}]*\}', re.IGNORECASE
+)
+_CSS_RGB_ARGS_RE = re.compile(r'(-?\d*\.?\d+)(%?)')
+# Perceived luminance (0-255, composited over white) above which a text colour
+# is reported as a likely light-on-light contrast problem.
+CSS_LIGHT_COLOR_LUMINANCE = 180
+_LABEL_WITH_FOR_RE = re.compile(r'<label[^>]*?for="([^"]+)"[^>]*>.*?</label>', re.DOTALL | re.IGNORECASE)
+_STYLE_DISPLAY_BLOCK_RE = re.compile(r'style="[^"]*display\s*:\s*block[^"]*"', re.IGNORECASE)
+
+# Trailing whitespace on every line (same result as rstrip() per '\n'-split line).
+_RE_TRAIL_WS = re.compile(r'[^\S\n]+(?=\n|\Z)')
+_RE_TEMPLATE_BLOCK = re.compile(r'<<<TEMPLATE>>>\s*(.*?)\s*<<<END TEMPLATE>>>', re.DOTALL)
+_AXE_CSS_BLOCK_MARKER = "/* Axe-based contrast fix para"
+# Separates a component .ts path from the 1-based index of one of its inline templates.
+_INLINE_TEMPLATE_SUFFIX = "::inline_template_"
+
+# Upper bound on threads used to read template sources concurrently.
+MAX_TEMPLATE_READ_WORKERS = 32
+
+# Maximum components processed (LLM round-trips in flight) at once in the phase 3 sandbox.
+MAX_SANDBOX_WORKERS = 8
+
+# Upper bound on threads used to walk several source roots at once.
+MAX_ROOT_WALK_WORKERS = 8
+
+# Dev-server readiness polling (seconds): exponential backoff between HEAD probes.
+DEV_SERVER_MAX_WAIT = 120
+DEV_SERVER_POLL_INITIAL = 0.25
+DEV_SERVER_POLL_MAX = 5
+
+# Overly generic class names we must NOT target with global CSS (would break layout).
+_GENERIC_SELECTORS = frozenset({
+    "btn", "container", "row", "col", "card", "nav", "navbar",
+    "form", "input", "label", "text", "title", "header", "footer",
+    "main", "content", "wrapper", "section", "div", "span", "p",
+    "a", "button", "img", "ul", "li", "table", "tr", "td",
+})
+
+# Prompt pieces for Axe-driven template fixes (formatted per issue / per template).
+_AXE_ISSUE_LINE_FMT = "- {vid} ({impact}) en <{tag}>"
+_AXE_ISSUE_DESC_FMT = "{line}: {desc}"
+_AXE_ISSUE_HTML_FMT = "  HTML: {html}..."
+_AXE_TEMPLATE_PROMPT_FMT = """Fix ALL {total} WCAG A/AA violations in this Angular template.
+
+TEMPLATE: {template_path}
+
+VIOLATIONS:
+{violations_text}
+
+QUICK RULES:
+- button-name → add visible text or aria-label="..." to <button>
+- color-contrast → adjust ONLY style="color:#000000" or "#FFFFFF" according to background
+- link-name → add descriptive text or aria-label="..." to <a>
+- image-alt / role-img-alt → add alt="..." or aria-label="..." to the visual element
+- frame-title → add title="..." to <iframe>
+- aria-* → add/fix aria attributes (aria-label, aria-labelledby, etc.)
+
+INSTRUCTIONS:
+- Fix ONLY the elements listed in the violations list.
+- Keep *ngIf, *ngFor, bindings and pipes intact.
+- Do not change layout or responsive classes (row, col-*, container, etc.).
+- Do not add unnecessary new HTML elements; prefer attributes on existing elements.
+
+FULL CURRENT TEMPLATE:
+```html
+{template_content}
+```
+
+Return ONLY the full corrected template, no explanations."""
+
+_AXE_SYSTEM_MESSAGE = (
+    "You are an EXPERT in web accessibility (WCAG 2.2 A+AA) and Angular. "
+    "Your MISSION is to fix ALL accessibility violations reported by Axe "
+    "by modifying the full HTML template. "
+    "🚨 CRITICAL: You MUST make real changes to the code. Do NOT return the same code. "
+    "🚨 If there are contrast violations, you MUST add or modify style=\"color: #XXXXXX;\" "
+    "🚨 If there are aria-label, button-name, link-name violations, etc., you MUST add the required attributes. "
+    "🚨 Keep Angular logic (bindings, *ngIf, *ngFor, pipes) intact. "
+    "🚨 If you return the same code unchanged, the fix FAILS completely."
+)
+
+_CSS_FIX_SYSTEM_MESSAGE = (
+    "You are an accessibility (WCAG 2.2 AA) and CSS expert. "
+    "Your task is to adjust text/background colours to improve contrast "
+    "WITHOUT changing layout or breaking the overall design."
+)
+
+_SANDBOX_SYSTEM_MESSAGE = (
+    "You are an EXPERT WEB ACCESSIBILITY AUDITOR and Angular developer. Your CRITICAL MISSION is: "
+    "1) THOROUGHLY ANALYSE every line of code to find ALL accessibility errors (WCAG 2.2 A+AA), "
+    "2) FIX EVERY ERROR found WITHOUT EXCEPTION, even if it requires significant changes. "
+    "You MUST ACTIVELY LOOK FOR: buttons/links without visible text or aria-label, inputs without labels, images without alt, "
+    "contrast issues, missing keyboard support, incorrect heading hierarchy, lists without structure, etc. "
+    "🚨🚨🚨 CRITICAL ON CONTRAST: If contrast errors are detected or you find elements with text that may have low contrast, "
+    "you MUST fix ALL contrast errors by adjusting text and/or background colour to meet WCAG (4.5:1 for normal text, 3:1 for large text). "
+    "On light backgrounds, use dark text colour (#000000, #212121, etc.); on dark backgrounds, use light text (#FFFFFF, #F5F5F5, etc.). "
+    "Do NOT fix just one, fix ALL. If there are 3 contrast errors, fix all 3. "
+    "🚨🚨🚨 CRITICAL ON RESPONSIVE DESIGN: "
+    "- PRESERVE ALL existing responsive styles (media queries, responsive classes, flexbox, grid, etc.) "
+    "- Do NOT change display:none to display:block unless absolutely necessary for accessibility "
+    "- If a label has display:none, it is visually hidden but accessible to screen readers - use sr-only or aria-label instead "
+    "- Do NOT add inline styles that break responsive design (fixed width, fixed height, excessive margin/padding, etc.) "
+    "- Keep all Bootstrap/CSS framework classes (col-sm-*, col-md-*, etc.) "
+    "- Do NOT modify layout properties like display, position, flex, grid, width, height, margin, padding unless critical for accessibility "
+    "🚨🚨🚨 CRITICAL ON SCREENSHOTS (if provided): "
+    "If screenshots are provided in the user message, you MUST examine them in detail. "
+    "These screenshots show how the application REALLY looks at different screen sizes. "
+    "YOUR GOAL: Fix ALL accessibility errors BUT preserve EXACTLY the visual design you see in the screenshots. "
+    "Fixes should be visually 'invisible' - use aria-label, roles, alt text, and minimal contrast adjustments. "
+    "The final result must look IDENTICAL to the screenshots, but accessible. "
+    "IMPORTANT: If the code has ANY accessibility issue, you MUST fix it. "
+    "Do NOT return the original code unchanged. ALWAYS look for and fix errors. "
+    "Accessibility IS IMPORTANT AND MUST BE FIXED, BUT if screenshots are provided, preserve the visual design they show. "
+    "Do NOT add HTML comments or attributes that show they were fixes. The code should look like original code."
+)
+
+_SCREENSHOT_INSTRUCTIONS = """
+📸 SCREENSHOTS - CRITICAL FOR PRESERVING DESIGN:
+
+I have taken screenshots of the application at different screen sizes (mobile, tablet, desktop) that show how the page REALLY looks before the fixes.
+
+🚨 MANDATORY INSTRUCTIONS ABOUT THE SCREENSHOTS:
+1. EXAMINE each screenshot in detail to understand:
+   - The current visual design (layout, colours, spacing, distribution)
+   - How content adapts at different screen sizes
+   - Which elements are visible/hidden at each size
+   - The application's overall visual style
+
+2. FIX ALL accessibility errors listed above, BUT:
+   - KEEP the visual design you see in the screenshots
+   - Do NOT change background colours, element sizes, or distribution shown in the images
+   - For contrast errors: adjust ONLY the text colour, keeping the background visible in the screenshots
+   - Do NOT add new visible elements (use aria-label or sr-only instead)
+   - Do NOT change display:none to display:block if that element is not visible in the screenshots
+   - Respect the responsive design: if it looks a certain way on mobile, keep it that way
+
+3. YOUR GOAL: Fix ALL accessibility errors WITHOUT changing how the page looks in the screenshots.
+   - Fixes should be visually "invisible"
+   - Use aria-label, roles, alt text, and minimal contrast adjustments
+   - The final design must look IDENTICAL to the screenshots, but accessible
+
+The screenshots show the application BEFORE the fixes. Your job is to make it accessible while keeping that exact visual appearance.
+"""
+
+# Violation-id keyword -> hint shown when the LLM returned a template unchanged.
+# Checked in order; the first keyword contained in the id wins.
+_HINT_MAP = {
+    "button-name": "Add aria-label or visible text to <button>",
+    "color-contrast": "Add/modify style=\"color: #XXXXXX;\"",
+    "link-name": "Add descriptive text or aria-label to <a>",
+    "aria": "Add/modify aria-* attributes",
+    "alt": "Add/modify alt attribute on <img>",
+    "image": "Add/modify alt attribute on <img>",
+}
+
+# Static-error category -> lowercase keywords, checked in priority order by
+# _categorize_errors; errors matching none of them fall into "other".
+_ERROR_CATEGORY_KEYWORDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("missing_alt", ("sin alt", "without alt")),
+    ("missing_label", ("sin label", "input sin", "without label")),
+    ("missing_aria_label", ("button without", "link without", "aria-label")),
+    ("contrast", ("contrast",)),
+)
+
+
+# Static-error category -> (heading, instructions) for _build_error_specific_prompt;
+# unknown categories use the "other" entry.
+_ERROR_PROMPT_SECTIONS: Dict[str, Tuple[str, str]] = {
+    "missing_alt": (
+        "🔴 IMAGES WITHOUT ALT ERRORS",
+        """ACTION REQUIRED: Add the alt attribute to ALL mentioned images.
+- If the image is informative: alt="Image description"
+- If the image is decorative: alt=""
+- In Angular, use [alt] for dynamic binding or alt="fixed text" for static
+
+FIX ALL images listed above.""",
+    ),
+    "missing_label": (
+        "🔴 INPUTS WITHOUT LABEL ERRORS",
+        """ACTION REQUIRED: Add <label> associated with ALL mentioned inputs.
+IMPORTANT ON RESPONSIVE:
+- If the input already has a label with display:none, do NOT change it to display:block
+- Instead, add aria-label to the input: <input id="inputId" aria-label="Description" ... />
+- Or use an sr-only (screen-reader-only) class for the label: <label for="inputId" class="sr-only">Text</label>
+- Only change display if the label does NOT exist and needs to be visible
+
+Correct example (preserving responsive):
+  <label for="inputId" class="sr-only">Label text</label>
+  <input id="inputId" ... />
+  
+Or alternatively:
+  <input id="inputId" aria-label="Label text" ... />
+
+FIX ALL inputs listed above.""",
+    ),
+    "missing_aria_label": (
+        "🔴 BUTTONS/LINKS WITHOUT ARIA-LABEL ERRORS",
+        """ACTION REQUIRED: Add descriptive aria-label to ALL mentioned buttons/links.
+- For static values: aria-label="Description"
+- For dynamic binding in Angular: [attr.aria-label]="variable"
+
+FIX ALL elements listed above.""",
+    ),
+    "contrast": (
+        "🔴 CONTRAST ERRORS",
+        """ACTION REQUIRED: Fix colour contrast for ALL mentioned elements.
+- Minimum ratio required: 4.5:1 for normal text, 3:1 for large text
+- On light backgrounds: use style="color: #000000" or #212121
+- On dark backgrounds: use style="color: #FFFFFF" or #F5F5F5
+- Find ALL similar elements and fix them too
+
+FIX ALL low-contrast elements listed above.""",
+    ),
+    "other": (
+        "🔴 OTHER ERRORS",
+        "ACTION REQUIRED: Fix these accessibility errors.",
+    ),
+}
+
+# Fixed parts of the Axe section built by _format_detected_errors; the numbered
+# violation list goes between them.
+_AXE_PROMPT_HEADER = """🔴 AXE ERRORS DETECTED ({count} found):
+These are REAL errors detected by the Axe accessibility tool on the rendered application. You MUST fix ALL of them without exception.
+
+"""
+_AXE_PROMPT_FOOTER = """
+
+ACTION REQUIRED FOR EACH ERROR:
+1. Locate the element in the template using:
+   - The CSS selector provided (e.g. "button[type=\"submit\"] > .mdc-button__label")
+     * Axe selectors may have specific CSS classes - look for them in the template
+     * If the selector has ">" (direct child), look for the parent > child structure in the template
+     * If the selector has classes like ".mdc-button__label", look for elements with class="..." that contain that class
+   - Or the HTML fragment shown (it may have Angular dynamic attributes that you should ignore)
+     * Ignore Angular dynamic attributes like _ngcontent-* and _nghost-*
+     * Search by text content, static attributes, and structure
+   - IMPORTANT: If you don't find the exact selector, look for variations:
+     * Search by contained text (e.g. "Login", "Save", etc.)
+     * Search by similar CSS classes
+     * Search by similar HTML structure
+
+2. Fix the specific error:
+   - If it's "color-contrast":
+     * CRITICAL: These are REAL errors detected on the rendered application. You MUST fix ALL of them.
+     * The contrast data shows the REAL colour in the rendered HTML (after CSS is applied)
+     * If the template already has style="color: ..." but Axe detects a different colour, the CSS is overriding it
+     * MANDATORY FIX: Add !important to the inline style so it overrides the CSS: style="color: #000000 !important;"
+     * Correction rules:
+       - If current ratio < 4.5 (normal text) or < 3.0 (large text), contrast is INSUFFICIENT and MUST be fixed
+       - On LIGHT backgrounds (white, light grey, etc.): use DARK text (color="#000000" or color="#212121")
+       - On DARK backgrounds (black, dark grey, dark colours): use LIGHT text (color="#FFFFFF" or color="#F5F5F5")
+       - Example: If Axe detects ratio 3.33 (insufficient), background is #ff4081 (pink), text is #ffffff (white),
+         change text to dark colour: style="color: #000000 !important;" or change background to a lighter one
+       - ALWAYS add !important to ensure the style applies over existing CSS
+     * LOCATION: Find the element using the CSS selector provided (e.g. "button[type=\"submit\"] > .mdc-button__label")
+       or find the HTML fragment shown in the template
+       * ⚠️ CRITICAL - Elements generated by Angular Material:
+         If the selector points to ".mdc-button__label", ".mat-button-label", or any element with " > " pointing to an internal span/div,
+         that element does NOT exist in your template - Angular Material generates it automatically in the rendered DOM.
+         
+         SPECIFIC EXAMPLE:
+         - Axe error: Selector ".mat-warn > .mdc-button__label", HTML "<span class="mdc-button__label">Get Started</span>"
+         - In your template you will find: <button mat-button color="warn">Get Started</button>
+         - FIX: Add the style to the PARENT BUTTON:
+           <button mat-button color="warn" style="color: #000000 !important;">Get Started</button>
+         - The style with !important will apply to the text inside the button, including the internal span generated by Angular Material
+         
+         GENERAL RULE:
+         - If the selector has " > .mdc-button__label" or " > .mat-button-label", find the parent button in the template
+         - Extract the parent selector (the part before " > ")
+         - Find that button in the template (it may have color="warn", class="mat-warn", or the button text)
+         - Apply style="color: [correct-color] !important;" directly to the button
+         - If ratio is insufficient and background is light (#fafafa, white, etc.), use dark colour (#000000)
+         - If ratio is insufficient and background is dark, use light colour (#FFFFFF)
+   - If it's "link-name" or "button-name": Add descriptive aria-label to the link/button
+   - If it's another error: Follow the description and help provided
+
+3. For contrast errors:
+   - The data shows the REAL colour detected by Axe in the rendered HTML
+   - If the template has a different colour, the CSS is overriding it
+   - You MUST use !important in the inline style to ensure it applies: style="color: #000000 !important;"
+   - Do NOT return the code without fixing these errors - they are REAL errors that exist in the application
+
+⚠️ CRITICAL: These errors EXIST in the rendered application. Do NOT return the same code. You MUST make visible changes."""
+
+# Maximum concurrent LLM requests when fixing global CSS per selector.
+MAX_CSS_FIX_WORKERS = 8
+
+# Maximum concurrent LLM requests when fixing templates from Axe results.
+MAX_TEMPLATE_FIX_WORKERS = 8
+
+# Source text cache for _read_text: path -> (st_mtime_ns, st_size, text).
+_source_text_cache: Dict[str, Tuple[int, int, str]] = {}
+
+# Parsed angular.json cache for _load_angular_config: path -> (st_mtime_ns, st_size, config).
+_angular_config_cache: Dict[str, Tuple[int, int, Dict]] = {}
+
+# Screenshot data-URL cache for _load_screenshot_data_url: path -> (st_mtime_ns, st_size, url).
+_screenshot_data_url_cache: Dict[str, Tuple[int, int, str]] = {}
+
+# Results derived from a parsed config, keyed by project root and valid while
+# the cached entry still holds the very same config object:
+# root -> (config, value).
+_default_project_cache: Dict[str, Tuple[Dict, Optional[str]]] = {}
+_source_roots_cache: Dict[str, Tuple[Dict, Tuple[Path, ...]]] = {}
+
+# Directories never worth descending into when looking for templates.
+_PRUNED_SOURCE_DIRS = frozenset({"node_modules", ".git", "dist", ".angular", ".nx", "coverage"})
+
+
+def _read_text(path: Path) -> str:
+    """
+    Read a UTF-8 source file, reusing the cached text while (mtime, size) match.
+
+    Size is part of the key because coarse filesystem timestamps can leave
+    mtime unchanged after a quick rewrite.
+    """
+    key = str(path)
+    stat = path.stat()
+    cached = _source_text_cache.get(key)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    with open(key, encoding="utf-8") as f:
+        text = f.read()
+    _source_text_cache[key] = (stat.st_mtime_ns, stat.st_size, text)
+    return text
+
+
+def _remember_written_text(path: Path, text: str) -> None:
+    """Record text just written to path so the next _read_text does not hit the disk."""
+    stat = path.stat()
+    _source_text_cache[str(path)] = (stat.st_mtime_ns, stat.st_size, text)
+
+
+def _encode_source_text(text: str) -> bytes:
+    """
+    Encode text as Path.write_text would: '\n' becomes the platform line ending.
+
+    _read_text decodes in universal-newline mode, so this keeps the files the
+    tool rewrites on the platform's line endings (CRLF on Windows), and the
+    encoded length is exactly the size written to disk.
+    """
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    return text.encode("utf-8")
+
+
+def _write_source_text(path: Path, text: str) -> None:
+    """Encode text once, write the bytes and prime the read cache with the same text."""
+    path.write_bytes(_encode_source_text(text))
+    _remember_written_text(path, text)
+
+
+def _write_text_atomic(path: Path, content: str) -> None:
+    """
+    Write UTF-8 text (platform line endings) via a sibling temp file and os.replace,
+    so readers never see a partial file.
+
+    The temp file name is unique, so concurrent writers (the sandbox pool) never
+    clobber each other's, and an existing target keeps its permission bits.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(_encode_source_text(content))
+        if path.exists():
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _try_read_text(path: Optional[Path]) -> Optional[str]:
+    """Read a source file, returning None when it is absent or cannot be read or decoded."""
+    if path is None:
+        return None
+    try:
+        return _read_text(path)
+    except Exception:
+        return None
+
+
+def _read_sources_concurrently(paths: List[Optional[Path]]) -> List[Optional[str]]:
+    """Read many source files on a thread pool, preserving input order."""
+    if len(paths) < 2:
+        return [_try_read_text(path) for path in paths]
+    workers = min(MAX_TEMPLATE_READ_WORKERS, (os.cpu_count() or 1) * 4, len(paths))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_try_read_text, paths))
+
+
+def _normalize_match(match: "re.Match") -> str:
+    """Drop matched runtime attributes; collapse any other whitespace run to one space."""
+    return "" if match.group(1) else " "
+
 
 def _normalize_angular_html(html: str) -> str:
     """
@@ -41,14 +551,32 @@ def _normalize_angular_html(html: str) -> str:
     if not html:
         return ""
 
-    import re
+    # Strip Angular runtime "noise" attributes and normalise whitespace in one pass
+    return _NG_NORMALIZE_RE.sub(_normalize_match, html).strip()
+
+
+@lru_cache(maxsize=512)
+def _normalize_axe_snippet(html: str) -> str:
+    """
+    Cached _normalize_angular_html for Axe node snippets, which repeat across
+    rules. Whole templates are normalised once per _TemplateRecord instead.
+    """
+    return _normalize_angular_html(html)
+
+
+@contextmanager
+def _driver_scope():
+    """
+    Yield a WebDriver from setup_driver() and always quit it on exit.
 
-    text = html
-    # Strip Angular runtime "noise" attributes from rendered DOM
-    text = re.sub(r'\s(?:_ngcontent-[^= ]*|_nghost-[^= ]*|ng-reflect-[\w-]+)="[^"]*"', "", text)
-    # Normalise whitespace
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
+    Keep every navigation of one analysis (page load, screenshots, Axe) inside
+    a single scope so Chrome is started once and its connections are reused.
+    """
+    driver = setup_driver()
+    try:
+        yield driver
+    finally:
+        driver.quit()
 
 
 def run_axe_on_angular_app(base_url: str, run_path: str, suffix: str = "") -> Dict:
@@ -79,8 +607,7 @@ def run_axe_on_angular_app(base_url: str, run_path: str, suffix: str = "") -> Di
             custom_interactions=None,
         )
 
-        with open(report_path, "w", encoding="utf-8") as f:
-            json.dump(axe_results, f, indent=2, ensure_ascii=False)
+        write_json_file(str(report_path), axe_results)
 
         print(f"[Angular + Axe] Report saved at: {report_path}")
         return axe_results
@@ -93,6 +620,263 @@ def run_axe_on_angular_app(base_url: str, run_path: str, suffix: str = "") -> Di
             driver.quit()
 
 
+def _iter_source_files(roots: List[Path]) -> Iterator[str]:
+    """
+    Lazily yield file paths under roots using os.scandir.
+
+    Build/vendor directories in _PRUNED_SOURCE_DIRS are pruned during the
+    traversal, so their contents are never listed.
+    """
+    stack = [str(root) for root in roots]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                subdirs = []
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in _PRUNED_SOURCE_DIRS:
+                                subdirs.append(entry.path)
+                            continue
+                    except OSError:
+                        continue
+                    yield entry.path
+        except OSError:
+            continue
+        stack.extend(subdirs)
+
+
+def _walk_angular_sources(roots: List[Path]) -> Tuple[List[Path], List[Path], List[Path]]:
+    """
+    Walk the given roots once, classifying files by suffix.
+
+    Returns:
+        Tuple of (component templates, component TypeScript files, other HTML files).
+    """
+    component_html: List[Path] = []
+    component_ts: List[Path] = []
+    static_html: List[Path] = []
+
+    for path in _iter_source_files(roots):
+        if path.endswith(".component.html"):
+            component_html.append(Path(path))
+        elif path.endswith(".component.ts"):
+            component_ts.append(Path(path))
+        elif path.endswith(".html"):
+            static_html.append(Path(path))
+
+    return component_html, component_ts, static_html
+
+
+def _char_mask(text: str) -> int:
+    """
+    64-bit signature of the characters in text (code point modulo 64).
+
+    If a snippet's mask has a bit the template's mask lacks, the snippet cannot
+    be a substring of that template.
+    """
+    mask = 0
+    for char in set(text):
+        mask |= 1 << (ord(char) & 63)
+    return mask
+
+
+class _TemplateRecord:
+    """
+    In-memory template used to match Axe snippets.
+
+    Only the raw text is stored up front (the raw-fragment fallback needs
+    it). The normalised text, its character mask and the lookup sets used for
+    selector matching are computed on first access, so templates that are
+    never scanned for a given path do not pay for them.
+    """
+
+    __slots__ = ("raw", "_normalized", "_mask", "_tags", "_tokens", "_ids", "_elements")
+
+    def __init__(self, raw: str) -> None:
+        self.raw = raw
+        self._normalized: Optional[str] = None
+        self._mask: Optional[int] = None
+        self._tags: Optional[set] = None
+        self._tokens: Optional[frozenset] = None
+        self._ids: Optional[frozenset] = None
+        self._elements: Optional[frozenset] = None
+
+    @property
+    def normalized(self) -> str:
+        if self._normalized is None:
+            self._normalized = _normalize_angular_html(self.raw)
+        return self._normalized
+
+    @property
+    def mask(self) -> int:
+        if self._mask is None:
+            self._mask = _char_mask(self.normalized)
+        return self._mask
+
+    @property
+    def tags(self) -> set:
+        if self._tags is None:
+            self._tags = set(_TAG_RE.findall(self.raw))
+        return self._tags
+
+    @property
+    def tokens(self) -> frozenset:
+        """Identifier-like words (class names in attributes, ngClass, [class.x], ...)."""
+        if self._tokens is None:
+            self._tokens = frozenset(_WORD_TOKEN_RE.findall(self.raw))
+        return self._tokens
+
+    @property
+    def ids(self) -> frozenset:
+        """Values of literal id="..." / id='...' attributes."""
+        if self._ids is None:
+            self._ids = frozenset(dq or sq for dq, sq in _ID_ATTR_RE.findall(self.raw))
+        return self._ids
+
+    @property
+    def elements(self) -> frozenset:
+        """Element names opened in the template, including custom ones (nb-icon)."""
+        if self._elements is None:
+            self._elements = frozenset(_ELEMENT_NAME_RE.findall(self.raw))
+        return self._elements
+
+
+class _SelectorIndex:
+    """
+    Inverted indices from selector parts to the templates that contain them.
+
+    Resolves an Axe target selector to candidate templates by intersecting
+    posting sets rather than testing every template.
+    """
+
+    def __init__(self, templates: Dict[str, _TemplateRecord]) -> None:
+        self._order = {rel_path: position for position, rel_path in enumerate(templates)}
+        self._by_token: Dict[str, set] = {}
+        self._by_id: Dict[str, set] = {}
+        self._by_element: Dict[str, set] = {}
+        for rel_path, tpl_data in templates.items():
+            for token in tpl_data.tokens:
+                self._by_token.setdefault(token, set()).add(rel_path)
+            for id_value in tpl_data.ids:
+                self._by_id.setdefault(id_value, set()).add(rel_path)
+            for element in tpl_data.elements:
+                self._by_element.setdefault(element, set()).add(rel_path)
+
+    def candidates(
+        self, classes: List[str], ids: List[str], element_names: List[str]
+    ) -> List[str]:
+        """
+        Templates containing any of element_names and all classes and ids.
+
+        Returns paths in template discovery order; empty when the selector has
+        no usable parts.
+        """
+        if not (classes or ids or element_names):
+            return []
+
+        postings: List[set] = [self._by_token.get(cls, set()) for cls in classes]
+        postings.extend(self._by_id.get(id_value, set()) for id_value in ids)
+        if element_names:
+            postings.append(set().union(*(self._by_element.get(e, set()) for e in element_names)))
+
+        postings.sort(key=len)
+        matches = set(postings[0])
+        for posting in postings[1:]:
+            if not matches:
+                break
+            matches &= posting
+        return sorted(matches, key=self._order.__getitem__)
+
+
+def _index_snippets_in_templates(
+    snippets: Iterable[str], templates: Dict[str, _TemplateRecord]
+) -> Optional[Dict[str, List[str]]]:
+    """
+    Find which templates contain each normalised snippet in a single pass.
+
+    Builds an Aho–Corasick automaton over the snippets and streams every
+    normalised template through it once. Template order is preserved in the
+    returned lists so "first match wins" behaves like the plain scan.
+
+    Returns:
+        Mapping snippet -> template paths containing it, or None when
+        pyahocorasick is not installed (callers fall back to substring checks).
+    """
+    if ahocorasick is None:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for snippet in set(snippets):
+        if snippet:
+            automaton.add_word(snippet, snippet)
+    if len(automaton) == 0:
+        return {}
+    automaton.make_automaton()
+
+    hits: Dict[str, List[str]] = {}
+    for rel_path, tpl_data in templates.items():
+        for _, snippet in automaton.iter(tpl_data.normalized):
+            paths = hits.setdefault(snippet, [])
+            if not paths or paths[-1] != rel_path:
+                paths.append(rel_path)
+    return hits
+
+
+def _match_snippet_by_content(
+    html_snippet: str,
+    normalized_snippet: str,
+    templates: Dict[str, _TemplateRecord],
+    snippet_hits: Optional[Dict[str, List[str]]],
+) -> Optional[str]:
+    """
+    Find the template containing an Axe node's HTML.
+
+    Tries the normalised snippet first, then the raw fragment. A match only
+    counts if the snippet's main element also appears in the template.
+
+    Returns:
+        Relative template path, or None when no template contains the snippet.
+    """
+    # Main element of the snippet, used to validate substring matches
+    snippet_tag = _TAG_RE.search(html_snippet)
+    tag_name = snippet_tag.group(1) if snippet_tag else None
+    if not tag_name:
+        return None
+
+    # 1) Search on normalised HTML
+    if snippet_hits is not None:
+        containing_paths = snippet_hits.get(normalized_snippet, ())
+    else:
+        # Cheap length / character-set prefilter before the substring scan
+        snippet_len = len(normalized_snippet)
+        snippet_mask = _char_mask(normalized_snippet)
+        containing_paths = (
+            rel_path
+            for rel_path, tpl_data in templates.items()
+            if snippet_len <= len(tpl_data.normalized)
+            and not snippet_mask & ~tpl_data.mask
+            and normalized_snippet in tpl_data.normalized
+        )
+    for rel_path in containing_paths:
+        # VALIDATION: ensure the snippet's main element is actually in the template
+        if tag_name in templates[rel_path].tags:
+            return rel_path
+
+    # 2) Fallback: try original fragment (unnormalised)
+    raw_snippet = html_snippet.strip()
+    for rel_path, tpl_data in templates.items():
+        if len(raw_snippet) > len(tpl_data.raw):
+            continue
+        if raw_snippet in tpl_data.raw:
+            # VALIDATION: ensure main element is in the template
+            if tag_name in tpl_data.tags:
+                return rel_path
+
+    return None
+
+
 def map_axe_violations_to_templates(
     axe_results: Dict, project_root: Path, source_roots: Optional[List[Path]] = None
 ) -> Dict[str, List[Dict]]:
@@ -134,43 +918,35 @@ def map_axe_violations_to_templates(
                 print(f"[Angular + Axe] Searching for templates across the whole project...")
                 source_roots = [project_root]
 
-    # Load all templates in memory: relative path -> {"normalized": str, "raw": str}
-    templates: Dict[str, Dict[str, str]] = {}
-    for root in source_roots:
-        # Include component templates (*.component.html)
-        for tpl_path in root.glob("**/*.component.html"):
-            try:
-                raw = tpl_path.read_text(encoding="utf-8")
-                normalized = _normalize_angular_html(raw)
-                rel = str(tpl_path.relative_to(project_root))
-                templates[rel] = {"normalized": normalized, "raw": raw}
-            except Exception:
-                continue
+    # Load all templates in memory: relative path -> _TemplateRecord
+    templates: Dict[str, _TemplateRecord] = {}
+    component_html_paths, component_ts_paths, static_html_paths = _walk_angular_sources(source_roots)
 
-        # Also include INLINE templates in TypeScript files (@Component({ template: `...` }))
-        for ts_path in root.glob("**/*.component.ts"):
-            try:
-                ts_raw = ts_path.read_text(encoding="utf-8")
-            except Exception:
-                continue
+    # Include component templates (*.component.html)
+    for tpl_path, raw in zip(component_html_paths, _read_sources_concurrently(component_html_paths)):
+        if raw is None:
+            continue
+        try:
+            rel = str(tpl_path.relative_to(project_root))
+            templates[rel] = _TemplateRecord(raw)
+        except Exception:
+            continue
 
-            import re
+    # Also include INLINE templates in TypeScript files (@Component({ template: `...` }))
+    for ts_path, ts_raw in zip(component_ts_paths, _read_sources_concurrently(component_ts_paths)):
+        if ts_raw is None:
+            continue
 
-            # Find template: ` ... ` inside @Component({ ... })
-            # Simple but effective pattern: template: `...`
-            inline_matches = re.findall(
-                r"template\s*:\s*`([\s\S]*?)`",
-                ts_raw,
-                flags=re.MULTILINE,
-            )
-            if not inline_matches:
-                continue
+        # Find template: ` ... ` inside @Component({ ... })
+        # Simple but effective pattern: template: `...`
+        inline_matches = _INLINE_TEMPLATE_RE.findall(ts_raw)
+        if not inline_matches:
+            continue
 
-            for idx, inline_tpl in enumerate(inline_matches, start=1):
-                normalized = _normalize_angular_html(inline_tpl)
-                # Use a virtual name for this inline template, tied to the .ts file
-                rel = str(ts_path.relative_to(project_root)) + f"::inline_template_{idx}"
-                templates[rel] = {"normalized": normalized, "raw": inline_tpl}
+        for idx, inline_tpl in enumerate(inline_matches, start=1):
+            # Use a virtual name for this inline template, tied to the .ts file
+            rel = f"{ts_path.relative_to(project_root)}{_INLINE_TEMPLATE_SUFFIX}{idx}"
+            templates[rel] = _TemplateRecord(inline_tpl)
     
     # Debug: show how many templates were found
     if not templates:
@@ -179,12 +955,14 @@ def map_axe_violations_to_templates(
             print(f"  - {root}")
         print(f"[Angular + Axe] Searching across the whole project...")
         # More aggressive search: scan entire project
-        for tpl_path in project_root.rglob("*.component.html"):
+        for path in _iter_source_files([project_root]):
+            if not path.endswith(".component.html"):
+                continue
+            tpl_path = Path(path)
             try:
-                raw = tpl_path.read_text(encoding="utf-8")
-                normalized = _normalize_angular_html(raw)
+                raw = _read_text(tpl_path)
                 rel = str(tpl_path.relative_to(project_root))
-                templates[rel] = {"normalized": normalized, "raw": raw}
+                templates[rel] = _TemplateRecord(raw)
             except Exception:
                 continue
     
@@ -200,29 +978,44 @@ def map_axe_violations_to_templates(
         index_html = src_dir / "index.html"
         if index_html.exists():
             try:
-                raw = index_html.read_text(encoding="utf-8")
-                normalized = _normalize_angular_html(raw)
+                raw = _read_text(index_html)
                 rel = str(index_html.relative_to(project_root))
-                templates[rel] = {"normalized": normalized, "raw": raw}
+                templates[rel] = _TemplateRecord(raw)
             except Exception:
                 pass
         
-        # Find other static HTML files (not components)
-        for html_path in src_dir.rglob("*.html"):
-            # Exclude components (already processed) and node_modules
-            if "node_modules" in str(html_path) or html_path.name.endswith(".component.html"):
-                continue
+        # Find other static HTML files (not components); node_modules is pruned by the walker.
+        # Reuse the source-root walk when it already covered src/.
+        if any(root == src_dir or root in src_dir.parents for root in source_roots):
+            src_html_paths = [p for p in static_html_paths if src_dir in p.parents]
+        else:
+            src_html_paths = _walk_angular_sources([src_dir])[2]
+        for html_path in src_html_paths:
             if html_path == index_html:  # Already processed
                 continue
             try:
-                raw = html_path.read_text(encoding="utf-8")
-                normalized = _normalize_angular_html(raw)
+                raw = _read_text(html_path)
                 rel = str(html_path.relative_to(project_root))
-                templates[rel] = {"normalized": normalized, "raw": raw}
+                templates[rel] = _TemplateRecord(raw)
             except Exception:
                 continue
 
     issues_by_template: Dict[str, List[Dict]] = {}
+    # Raw snippet -> template matched by content (Axe repeats nodes across rules)
+    content_matches: Dict[str, Optional[str]] = {}
+    # Built on first use of the selector path
+    selector_index: Optional[_SelectorIndex] = None
+
+    # Resolve snippet -> containing templates up front (None without pyahocorasick)
+    snippet_hits = _index_snippets_in_templates(
+        (
+            _normalize_axe_snippet(node.get("html") or "")
+            for violation in violations
+            for node in violation.get("nodes", [])
+            if node.get("html")
+        ),
+        templates,
+    )
 
     for violation in violations:
         violation_id = violation.get("id", "")
@@ -231,35 +1024,18 @@ def map_axe_violations_to_templates(
             if not html_snippet:
                 continue
 
-            normalized_snippet = _normalize_angular_html(html_snippet)
+            normalized_snippet = _normalize_axe_snippet(html_snippet)
             if not normalized_snippet.strip():
                 continue
 
-            matched_template = None
-
-            # 1) Search on normalised HTML
-            for rel_path, tpl_data in templates.items():
-                if normalized_snippet in tpl_data["normalized"]:
-                    # VALIDATION: ensure the snippet's main element is actually in the template
-                    snippet_tag = re.search(r'<(\w+)', html_snippet)
-                    if snippet_tag:
-                        tag_name = snippet_tag.group(1)
-                        if f'<{tag_name}' in tpl_data["raw"] or f'<{tag_name} ' in tpl_data["raw"]:
-                            matched_template = rel_path
-                            break
-
-            # 2) Fallback: try original fragment (unnormalised)
-            if not matched_template:
-                raw_snippet = html_snippet.strip()
-                for rel_path, tpl_data in templates.items():
-                    if raw_snippet and raw_snippet in tpl_data["raw"]:
-                        # VALIDATION: ensure main element is in the template
-                        snippet_tag = re.search(r'<(\w+)', raw_snippet)
-                        if snippet_tag:
-                            tag_name = snippet_tag.group(1)
-                            if f'<{tag_name}' in tpl_data["raw"] or f'<{tag_name} ' in tpl_data["raw"]:
-                                matched_template = rel_path
-                                break
+            # 1) + 2) Match by HTML content; identical snippets are resolved once
+            if html_snippet in content_matches:
+                matched_template = content_matches[html_snippet]
+            else:
+                matched_template = _match_snippet_by_content(
+                    html_snippet, normalized_snippet, templates, snippet_hits
+                )
+                content_matches[html_snippet] = matched_template
 
             # 3) Extra step: try Axe CSS selector (classes/ids) to locate the template
             if not matched_template:
@@ -267,8 +1043,6 @@ def map_axe_violations_to_templates(
                 selector = targets[0] if targets and isinstance(targets[0], str) else None
 
                 if selector:
-                    import re
-
                     # Special case: errors on root elements like <html>
                     if selector == "html" and violation_id == "html-has-lang":
                         # Look for index.html specifically
@@ -280,45 +1054,14 @@ def map_axe_violations_to_templates(
                             pass
 
                     if not matched_template:
-                        classes = re.findall(r"\.([a-zA-Z0-9_-]+)", selector)
-                        ids = re.findall(r"#([a-zA-Z0-9_-]+)", selector)
+                        classes = _SELECTOR_CLASS_RE.findall(selector)
+                        ids = _SELECTOR_ID_RE.findall(selector)
                         # Also match element names (no . or #)
-                        element_names = re.findall(r"^([a-zA-Z][a-zA-Z0-9-]*)(?=[\.#\s>+~:\[\]()]|$)", selector)
-
-                        candidate_paths = []
-                        for rel_path, tpl_data in templates.items():
-                            raw_tpl = tpl_data["raw"]
-
-                            # Buscar por nombres de elementos (ej: "html", "body", "nb-icon")
-                            if element_names:
-                                element_found = False
-                                for elem_name in element_names:
-                                    # Find element in template (may have attributes)
-                                    if f"<{elem_name}" in raw_tpl or f"<{elem_name} " in raw_tpl or f"<{elem_name}>" in raw_tpl:
-                                        element_found = True
-                                        break
-                                if not element_found:
-                                    continue
-
-                            # All selector classes must appear in the template
-                            if classes and not all(cls in raw_tpl for cls in classes):
-                                continue
-
-                            # All selector ids must appear in the template
-                            if ids:
-                                has_all_ids = True
-                                for id_value in ids:
-                                    if (
-                                        f'id="{id_value}"' not in raw_tpl
-                                        and f"id='{id_value}'" not in raw_tpl
-                                    ):
-                                        has_all_ids = False
-                                        break
-                                if not has_all_ids:
-                                    continue
-
-                            if classes or ids or element_names:
-                                candidate_paths.append(rel_path)
+                        element_names = _SELECTOR_ELEMENT_RE.findall(selector)
+
+                        if selector_index is None:
+                            selector_index = _SelectorIndex(templates)
+                        candidate_paths = selector_index.candidates(classes, ids, element_names)
 
                         # If only one clear candidate, use it
                         if len(candidate_paths) == 1:
@@ -353,6 +1096,172 @@ def map_axe_violations_to_templates(
     return issues_by_template
 
 
+def _strip_axe_css_blocks(css: str) -> str:
+    """
+    Remove previously generated "Axe-based contrast fix" blocks from a stylesheet.
+
+    Each block is the marker comment plus the rule after it, up to the first
+    closing brace. The scan is a forward walk with str.find, so its cost stays
+    linear in the stylesheet size. A marker whose rule runs into another
+    comment, or never closes, is left untouched.
+    """
+    parts: List[str] = []
+    pos = 0
+    search_from = 0
+    while True:
+        start = css.find(_AXE_CSS_BLOCK_MARKER, search_from)
+        if start < 0:
+            break
+        comment_end = css.find("*/", start + len(_AXE_CSS_BLOCK_MARKER))
+        brace_end = css.find("}", comment_end + 2) if comment_end >= 0 else -1
+        if brace_end < 0:
+            break
+        next_comment_end = css.find("*/", comment_end + 2, brace_end)
+        if next_comment_end >= 0 or "*" in css[start + 2 : comment_end]:
+            # Not a generated block; keep it and look further on
+            search_from = start + len(_AXE_CSS_BLOCK_MARKER)
+            continue
+        parts.append(css[pos:start])
+        pos = search_from = brace_end + 1
+    parts.append(css[pos:])
+    return "".join(parts)
+
+
+def _request_css_fix_for_selector(
+    client,
+    selector: str,
+    issues: List[Dict],
+    original_styles: str,
+    existing_selectors: frozenset,
+) -> Optional[str]:
+    """
+    Ask the LLM for a contrast fix for one selector.
+
+    Returns:
+        The annotated CSS block to append to the global stylesheet, or None when
+        the response is unusable or the request fails.
+    """
+    # Build problem text for the prompt
+    problems_lines: List[str] = []
+    for issue in issues:
+        data = (issue.get("contrast") or {}) if issue.get("contrast") else {}
+        bg = data.get("bgColor")
+        fg = data.get("fgColor")
+        ratio = data.get("contrastRatio")
+        expected = data.get("expectedContrastRatio")
+        problems_lines.append(
+            f"- Selector: {selector} | bgColor: {bg} | fgColor: {fg} | "
+            f"ratio: {ratio} | ratio requerido: {expected}"
+        )
+
+    problems_text = "\n".join(problems_lines)
+
+    # Check if a rule for this selector already exists (avoid duplicates)
+    existing_note = ""
+    if selector.lower() in existing_selectors:
+        existing_note = f"\n⚠️ IMPORTANTE: Ya existe una regla para {selector} en el CSS. Tu nueva regla DEBE usar !important para sobrescribirla."
+
+    prompt = f"""
+Tienes un proyecto Angular con Bootstrap. Axe ha detectado ERRORES DE CONTRASTE (regla color-contrast)
+para el selector CSS {selector}.
+
+DETALLES DE LAS VIOLACIONES (PUEDEN SER VARIAS INSTANCIAS):
+{problems_text}
+{existing_note}
+
+HOJA DE ESTILOS GLOBAL ACTUAL (resumen):
+```css
+{original_styles[:4000]}
+```
+
+CRITICAL TASK:
+- You must propose new CSS rules for the selector {selector} (and only for it) that fix
+  ALL the indicated contrast errors.
+- Since this project uses Bootstrap, you MUST use !important on color so that
+  your rules override Bootstrap styles.
+- 🚨 IMPORTANT: Do NOT use `background-color` unless absolutely necessary.
+  Bootstrap already handles backgrounds correctly. Only adjust the text `color`.
+- Do NOT change layout: do NOT touch display, position, flex, grid, width, height,
+  margin, padding, align-items, justify-content, etc.
+- YOU MAY ONLY MODIFY OR ADD:
+  - color (with !important) - REQUIRED
+  - font-weight (optional, only if it really helps readability)
+- Choose colours that meet at least the required ratio (4.5:1 for normal text, 3:1 for large text).
+- For dark backgrounds (#007bff, #17a2b8, etc.), use light text (#ffffff or similar).
+- For light backgrounds, use dark text (#000000, #212121, etc.).
+
+MANDATORY RESPONSE FORMAT:
+Return EXCLUSIVELY a CSS block ready to PASTE at the end of styles.css/styles.scss,
+DELIMITED by:
+
+<<<UPDATED_CSS>>>
+{selector} {{
+  color: #XXXXXX !important;
+}}
+<<<END_UPDATED_CSS>>>
+
+NOTE: Include only `color`, do NOT include `background-color` unless absolutely critical.
+
+Do NOT include explanations, markdown, or ```css```, only the block between the markers.
+""".strip()
+
+    system_message = _CSS_FIX_SYSTEM_MESSAGE
+
+    try:
+        response = client.chat.completions.create(
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": system_message},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.0,
+        )
+        content = response.choices[0].message.content or ""
+        log_openai_call(
+            prompt=prompt,
+            response=content,
+            model="gpt-4o",
+            call_type="angular_axe_css_fix",
+        )
+
+        # Extract UPDATED_CSS block
+        start_marker = "<<<UPDATED_CSS>>>"
+        end_marker = "<<<END_UPDATED_CSS>>>"
+        start_idx = content.find(start_marker)
+        end_idx = content.find(end_marker)
+        if start_idx == -1 or end_idx == -1 or end_idx <= start_idx:
+            return None
+
+        updated_block = content[start_idx + len(start_marker) : end_idx].strip()
+        if not updated_block:
+            return None
+
+        # Basic validation: avoid dangerous layout properties
+        forbidden_props = [
+            "display:",
+            "position:",
+            "flex:",
+            "grid:",
+            "width:",
+            "height:",
+            "margin:",
+            "padding:",
+            "top:",
+            "left:",
+            "right:",
+            "bottom:",
+        ]
+        lower_block = updated_block.lower()
+        if any(prop in lower_block for prop in forbidden_props):
+            return None
+
+        return f"/* Axe-based contrast fix para {selector} */\n{updated_block}\n"
+
+    except Exception as e:
+        print(f"[Angular + Axe CSS] ⚠️ Error fixing selector {selector}: {e}")
+        return None
+
+
 def fix_css_with_axe(
     axe_results: Dict, project_root: Path, client
 ) -> Dict[str, Dict[str, str]]:
@@ -393,18 +1302,8 @@ def fix_css_with_axe(
         return fixes
 
     # Group contrast violations by simple (class) selector
-    from collections import defaultdict
-    import re
 
     issues_by_selector: Dict[str, List[Dict]] = defaultdict(list)
-    
-    # Overly generic selectors we must NOT use (would break layout)
-    GENERIC_SELECTORS_BLACKLIST = {
-        ".btn", ".container", ".row", ".col", ".card", ".nav", ".navbar",
-        ".form", ".input", ".label", ".text", ".title", ".header", ".footer",
-        ".main", ".content", ".wrapper", ".section", ".div", ".span", ".p",
-        ".a", ".button", ".img", ".ul", ".li", ".table", ".tr", ".td"
-    }
 
     for violation in violations:
         if violation.get("id") != "color-contrast":
@@ -421,16 +1320,12 @@ def fix_css_with_axe(
             if class_match:
                 classes_in_html = class_match.group(1).split()
                 if classes_in_html:
-                    # Prefer more specific classes (not in blacklist)
-                    # e.g. "btn btn-primary" -> prefer ".btn-primary" over ".btn"
-                    for cls in reversed(classes_in_html):  # Start from last (most specific)
-                        candidate = f".{cls}"
-                        if candidate not in GENERIC_SELECTORS_BLACKLIST:
-                            selector = candidate
-                            break
-                    # If all in blacklist, use last anyway (better than nothing)
-                    if not selector and classes_in_html:
-                        selector = f".{classes_in_html[-1]}"
+                    # Prefer the most specific class not in the blacklist, starting from the last
+                    # (e.g. "btn btn-primary" -> ".btn-primary"); if all are generic, use the last anyway
+                    selector = "." + next(
+                        (cls for cls in reversed(classes_in_html) if cls not in _GENERIC_SELECTORS),
+                        classes_in_html[-1],
+                    )
 
             # 2) If no class in HTML, use Axe target if it's a simple class
             if not selector and targets and isinstance(targets[0], str):
@@ -440,24 +1335,27 @@ def fix_css_with_axe(
                 if class_parts:
                     # Use the last class found (most specific)
                     selector = f".{class_parts[-1]}"
-                    if selector in GENERIC_SELECTORS_BLACKLIST:
+                    if class_parts[-1] in _GENERIC_SELECTORS:
                         # If generic, try the previous one
                         if len(class_parts) > 1:
                             selector = f".{class_parts[-2]}"
                         else:
                             selector = None  # Discard if only one generic class
 
-            if not selector or selector in GENERIC_SELECTORS_BLACKLIST:
+            if not selector or selector[1:] in _GENERIC_SELECTORS:
                 continue
 
             # Extract contrast data from first relevant entry
-            contrast_data = None
-            any_checks = node.get("any", []) or []
-            for check in any_checks:
-                data = check.get("data")
-                if isinstance(data, dict) and data.get("bgColor") and data.get("fgColor"):
-                    contrast_data = data
-                    break
+            contrast_data = next(
+                (
+                    data
+                    for check in node.get("any", []) or []
+                    if isinstance(data := check.get("data"), dict)
+                    and data.get("bgColor")
+                    and data.get("fgColor")
+                ),
+                None,
+            )
 
             issues_by_selector[selector].append(
                 {
@@ -470,150 +1368,36 @@ def fix_css_with_axe(
     if not issues_by_selector:
         return fixes
 
-    updated_css_blocks: List[str] = []
-
-    for selector, issues in issues_by_selector.items():
-        # Build problem text for the prompt
-        problems_lines: List[str] = []
-        for issue in issues:
-            data = (issue.get("contrast") or {}) if issue.get("contrast") else {}
-            bg = data.get("bgColor")
-            fg = data.get("fgColor")
-            ratio = data.get("contrastRatio")
-            expected = data.get("expectedContrastRatio")
-            problems_lines.append(
-                f"- Selector: {selector} | bgColor: {bg} | fgColor: {fg} | "
-                f"ratio: {ratio} | ratio requerido: {expected}"
-            )
-
-        problems_text = "\n".join(problems_lines)
-
-        # Check if a rule for this selector already exists (avoid duplicates)
-        selector_exists = re.search(rf'\.{re.escape(selector.lstrip("."))}\s*\{{', original_styles, re.IGNORECASE)
-        existing_note = ""
-        if selector_exists:
-            existing_note = f"\n⚠️ IMPORTANTE: Ya existe una regla para {selector} en el CSS. Tu nueva regla DEBE usar !important para sobrescribirla."
-
-        prompt = f"""
-Tienes un proyecto Angular con Bootstrap. Axe ha detectado ERRORES DE CONTRASTE (regla color-contrast)
-para el selector CSS {selector}.
-
-DETALLES DE LAS VIOLACIONES (PUEDEN SER VARIAS INSTANCIAS):
-{problems_text}
-{existing_note}
-
-HOJA DE ESTILOS GLOBAL ACTUAL (resumen):
-```css
-{original_styles[:4000]}
-```
-
-CRITICAL TASK:
-- You must propose new CSS rules for the selector {selector} (and only for it) that fix
-  ALL the indicated contrast errors.
-- Since this project uses Bootstrap, you MUST use !important on color so that
-  your rules override Bootstrap styles.
-- 🚨 IMPORTANT: Do NOT use `background-color` unless absolutely necessary.
-  Bootstrap already handles backgrounds correctly. Only adjust the text `color`.
-- Do NOT change layout: do NOT touch display, position, flex, grid, width, height,
-  margin, padding, align-items, justify-content, etc.
-- YOU MAY ONLY MODIFY OR ADD:
-  - color (with !important) - REQUIRED
-  - font-weight (optional, only if it really helps readability)
-- Choose colours that meet at least the required ratio (4.5:1 for normal text, 3:1 for large text).
-- For dark backgrounds (#007bff, #17a2b8, etc.), use light text (#ffffff or similar).
-- For light backgrounds, use dark text (#000000, #212121, etc.).
-
-MANDATORY RESPONSE FORMAT:
-Return EXCLUSIVELY a CSS block ready to PASTE at the end of styles.css/styles.scss,
-DELIMITED by:
-
-<<<UPDATED_CSS>>>
-{selector} {{
-  color: #XXXXXX !important;
-}}
-<<<END_UPDATED_CSS>>>
-
-NOTE: Include only `color`, do NOT include `background-color` unless absolutely critical.
-
-Do NOT include explanations, markdown, or ```css```, only the block between the markers.
-""".strip()
+    # Selectors that already have a rule in the stylesheet (single scan, lower-cased)
+    existing_selectors = frozenset(
+        match.lower() for match in _CSS_RULE_SELECTOR_RE.findall(original_styles)
+    )
 
-        system_message = (
-            "You are an accessibility (WCAG 2.2 AA) and CSS expert. "
-            "Your task is to adjust text/background colours to improve contrast "
-            "WITHOUT changing layout or breaking the overall design."
+    # One request per selector, issued concurrently; results keep selector order
+    workers = min(MAX_CSS_FIX_WORKERS, len(issues_by_selector))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        css_blocks = executor.map(
+            lambda item: _request_css_fix_for_selector(
+                client, item[0], item[1], original_styles, existing_selectors
+            ),
+            issues_by_selector.items(),
         )
-
-        try:
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.0,
-            )
-            content = response.choices[0].message.content or ""
-            log_openai_call(
-                prompt=prompt,
-                response=content,
-                model="gpt-4o",
-                call_type="angular_axe_css_fix",
-            )
-
-            # Extract UPDATED_CSS block
-            start_marker = "<<<UPDATED_CSS>>>"
-            end_marker = "<<<END_UPDATED_CSS>>>"
-            start_idx = content.find(start_marker)
-            end_idx = content.find(end_marker)
-            if start_idx == -1 or end_idx == -1 or end_idx <= start_idx:
-                continue
-
-            updated_block = content[start_idx + len(start_marker) : end_idx].strip()
-            if not updated_block:
-                continue
-
-            # Basic validation: avoid dangerous layout properties
-            forbidden_props = [
-                "display:",
-                "position:",
-                "flex:",
-                "grid:",
-                "width:",
-                "height:",
-                "margin:",
-                "padding:",
-                "top:",
-                "left:",
-                "right:",
-                "bottom:",
-            ]
-            lower_block = updated_block.lower()
-            if any(prop in lower_block for prop in forbidden_props):
-                continue
-
-            updated_css_blocks.append(
-                f"/* Axe-based contrast fix para {selector} */\n{updated_block}\n"
-            )
-
-        except Exception as e:
-            print(f"[Angular + Axe CSS] ⚠️ Error fixing selector {selector}: {e}")
-            continue
+        updated_css_blocks: List[str] = [block for block in css_blocks if block]
 
     if not updated_css_blocks:
         return fixes
 
     # Remove old "Axe-based contrast fix" rules to avoid accumulation
-    # Use regex to strip blocks starting with "/* Axe-based contrast fix" until next block or end
-    axe_block_pattern = r'/\* Axe-based contrast fix para[^*]*\*/(?:[^*]|\*(?!/))*?}'
-    cleaned_styles = re.sub(axe_block_pattern, '', original_styles, flags=re.DOTALL)
+    # Each "/* Axe-based contrast fix" marker is found with str.find and dropped together
+    # with the rule after it, up to its closing brace
+    cleaned_styles = _strip_axe_css_blocks(original_styles)
     # Collapse multiple blank lines
     cleaned_styles = re.sub(r'\n\s*\n\s*\n+', '\n\n', cleaned_styles).rstrip()
 
     new_styles = cleaned_styles + "\n\n" + "\n\n".join(updated_css_blocks) + "\n"
     if new_styles != original_styles:
         try:
-            styles_path.write_text(new_styles, encoding="utf-8")
+            _write_text_atomic(styles_path, new_styles)
             fixes[str(styles_path)] = {
                 "original": original_styles,
                 "corrected": new_styles,
@@ -627,73 +1411,444 @@ Do NOT include explanations, markdown, or ```css```, only the block between the
     return fixes
 
 
-def _build_axe_based_prompt_for_template(
-    template_path: str, template_content: str, issues: List[Dict]
-) -> str:
+def _build_axe_based_prompt_for_template(
+    template_path: str, template_content: str, issues: List[Dict]
+) -> str:
+    """
+    Prompt compacto para corregir accesibilidad en un template Angular
+    a partir de las violaciones de Axe.
+    """
+    violations_lines: List[str] = []
+
+    for issue in issues:
+        violation = issue.get("violation", {}) or {}
+        node = issue.get("node", {}) or {}
+
+        desc = violation.get("description", "")
+        html_snippet = (node.get("html") or "").strip()
+
+        # Main tag of the snippet (so the model knows what to look for)
+        m = _TAG_RE.search(html_snippet)
+
+        # Main violation line
+        line = _AXE_ISSUE_LINE_FMT.format(
+            vid=violation.get("id", "unknown"),
+            impact=violation.get("impact", "moderate"),
+            tag=m.group(1) if m else "elemento",
+        )
+        if desc:
+            line = _AXE_ISSUE_DESC_FMT.format(line=line, desc=desc)
+        violations_lines.append(line)
+
+        # Add a single HTML line for reference
+        if html_snippet:
+            first_line = html_snippet.split("\n", 1)[0].strip()
+            violations_lines.append(_AXE_ISSUE_HTML_FMT.format(html=first_line[:200]))
+
+    return _AXE_TEMPLATE_PROMPT_FMT.format(
+        total=len(issues),
+        template_path=template_path,
+        violations_text="\n".join(violations_lines),
+        template_content=template_content,
+    ).strip()
+
+
+def _prepare_axe_template_fix(
+    rel_path: str, issues: List[Dict], project_root: Path
+) -> Optional[Dict]:
+    """
+    Load a mapped template, drop mis-mapped issues and build its fix prompt.
+
+    Returns:
+        A job dict for the request/apply steps, or None when there is nothing
+        to fix in this template.
+    """
+    # Support both HTML file templates and INLINE templates in .ts
+    is_inline = _INLINE_TEMPLATE_SUFFIX in rel_path
+
+    if is_inline:
+        # Example rel_path:
+        #   "src/app/components/ng-style/ng-style.component.ts::inline_template_1"
+        ts_rel, inline_id = rel_path.split(_INLINE_TEMPLATE_SUFFIX, 1)
+        tpl_path = project_root / ts_rel
+        if not tpl_path.exists():
+            return None
+        ts_content = _read_text(tpl_path)
+
+        # Relocate all template: ` ... ` occurrences
+        inline_matches = list(_INLINE_TEMPLATE_RE.finditer(ts_content))
+        if not inline_matches:
+            return None
+
+        # Compute inline template index (1-based in virtual name)
+        try:
+            target_idx = int(inline_id)
+        except ValueError:
+            target_idx = 1
+
+        if target_idx < 1 or target_idx > len(inline_matches):
+            return None
+
+        match = inline_matches[target_idx - 1]
+        original_content = match.group(1)
+    else:
+        tpl_path = project_root / rel_path
+        if not tpl_path.exists():
+            return None
+
+        original_content = _read_text(tpl_path)
+
+    if not original_content.strip():
+        return None
+
+    # CRITICAL VALIDATION: ensure violations actually belong to this template
+    print(f"[Angular + Axe] 🔍 Validating violation mapping for {rel_path}...")
+    valid_issues = []
+    invalid_issues = []
+    # Element names opened in the template, collected in a single scan
+    present_tags = {tag.lower() for tag in _TAG_RE.findall(original_content)}
+
+    for issue in issues:
+        violation = issue.get("violation", {})
+        node = issue.get("node", {})
+        html_snippet = (node.get("html") or "").strip()
+        violation_id = violation.get("id", "unknown")
+        is_valid = True
+        
+        if html_snippet:
+            # Extract snippet's main tag
+            snippet_tag_match = _TAG_RE.search(html_snippet)
+            if snippet_tag_match:
+                snippet_tag = snippet_tag_match.group(1)
+                # Ensure the tag is in the template
+                if snippet_tag not in ['html', 'body', 'head']:  # Exclude root tags
+                    if snippet_tag.lower() not in present_tags:
+                        print(f"[Angular + Axe] ⚠️ Violation {violation_id} has element <{snippet_tag}> not in this template")
+                        print(f"  → HTML snippet: {html_snippet[:150]}...")
+                        print(f"  → This violation will be SKIPPED because mapping looks incorrect")
+                        is_valid = False
+        
+        if is_valid:
+            valid_issues.append(issue)
+        else:
+            invalid_issues.append(issue)
+    
+    if invalid_issues:
+        print(f"[Angular + Axe] ⚠️ Skipped {len(invalid_issues)} violation(s) with incorrect mapping")
+    
+    if not valid_issues:
+        print(f"[Angular + Axe] ⚠️ No valid violations to fix in {rel_path}. Skipping...")
+        return None
+    
+    # Use only valid violations
+    issues = valid_issues
+    print(f"[Angular + Axe] ✓ {len(issues)} valid violation(s) to fix in {rel_path}")
+    
+    prompt = _build_axe_based_prompt_for_template(
+        rel_path, original_content, issues
+    )
+
+    print(f"[Angular + Axe] Fixing template based on Axe: {rel_path}")
+    
+    # Log prompt for debugging (first 1000 chars)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[Angular + Axe] 📝 Prompt (first 1000 chars): %s...", prompt[:1000])
+        logger.debug("[Angular + Axe] 📄 Original code (first 500 chars): %s...", original_content[:500])
+
+    return {
+        "rel_path": rel_path,
+        "issues": issues,
+        "prompt": prompt,
+        "original_content": original_content,
+        "tpl_path": tpl_path,
+        "is_inline": is_inline,
+        "inline_index": target_idx if is_inline else None,
+    }
+
+
+def _template_fix_key(content: str, issues: List[Dict]) -> bytes:
+    """
+    Identify an LLM template fix by template bytes and the violation ids to fix.
+
+    The prompt itself also names the template path, so identical templates
+    shared by several components would never collide on it.
+    """
+    violation_ids = sorted((issue.get("violation", {}) or {}).get("id", "unknown") for issue in issues)
+    return (
+        hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+        + hashlib.blake2b(json.dumps(violation_ids).encode("utf-8"), digest_size=8).digest()
+    )
+
+
+def _request_axe_template_fix(client, prompt: str) -> str:
+    """Send one template-fix prompt to the LLM and return the raw response text."""
+    response = client.chat.completions.create(
+        model="gpt-4o",
+        messages=[
+            {"role": "system", "content": _AXE_SYSTEM_MESSAGE},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.0,
+    )
+
+    corrected = response.choices[0].message.content or ""
+    
+    # Log LLM response (first 500 chars)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[Angular + Axe] 📝 LLM response (first 500 chars): %s...", corrected[:500])
+    
+    log_openai_call(
+        prompt=prompt,
+        response=corrected,
+        model="gpt-4o",
+        call_type="angular_axe_template_fix",
+    )
+
+    return corrected
+
+
+def _extract_diff_features(text: str) -> Tuple[List[str], set, set, set]:
     """
-    Prompt compacto para corregir accesibilidad en un template Angular
-    a partir de las violaciones de Axe.
-    """
-    violations_lines: List[str] = []
+    Collect the attributes used to judge whether an LLM fix changed anything.
 
-    for issue in issues:
-        violation = issue.get("violation", {}) or {}
-        node = issue.get("node", {}) or {}
-
-        v_id = violation.get("id", "unknown")
-        impact = violation.get("impact", "moderate")
-        desc = violation.get("description", "")
-        html_snippet = (node.get("html") or "").strip()
+    Returns:
+        (colour values, aria-* attributes, alt attributes, <label> open tags),
+        gathered in a single pass of _DIFF_RE.
+    """
+    colors: List[str] = []
+    features: Dict[str, set] = {"aria": set(), "alt": set(), "label": set()}
+    for match in _DIFF_RE.finditer(text or ""):
+        kind = match.lastgroup
+        if kind == "color":
+            colors.append(match.group("color"))
+        else:
+            features[kind].add(match.group(kind))
+    return colors, features["aria"], features["alt"], features["label"]
 
-        # Main tag of the snippet (so the model knows what to look for)
-        tag = "elemento"
-        m = re.search(r"<(\w+)", html_snippet)
-        if m:
-            tag = m.group(1)
 
-        # Main violation line
-        line = f"- {v_id} ({impact}) en <{tag}>"
-        if desc:
-            line += f": {desc}"
-        violations_lines.append(line)
+def _apply_axe_template_fix(
+    job: Dict,
+    corrected: str,
+    fixes: Dict[str, Dict[str, str]],
+    pending_inline: Dict[Path, List[Tuple[Dict, str]]],
+) -> None:
+    """
+    Post-process an LLM response for one template and write it if it is a real fix.
 
-        # Add a single HTML line for reference
-        if html_snippet:
-            first_line = html_snippet.splitlines()[0].strip()
-            violations_lines.append(f"  HTML: {first_line[:200]}...")
+    Successful fixes are recorded in fixes under the template's rel_path.
+    Inline-template fixes are queued in pending_inline under their .ts file
+    and written together by _write_inline_template_fixes.
+    """
+    rel_path = job["rel_path"]
+    issues = job["issues"]
+    original_content = job["original_content"]
+    tpl_path = job["tpl_path"]
+    is_inline = job["is_inline"]
+
+    # Strip possible code block markers (first fenced block, minus its language line)
+    corrected = corrected.strip()
+    if corrected.startswith("```"):
+        fence_match = _FENCE_RE.match(corrected)
+        if fence_match:
+            corrected = fence_match.group(1).strip()
+        else:
+            corrected = corrected.replace("```html", "").replace("```", "").strip()
 
-    violations_text = "\n".join(violations_lines)
-    total = len(issues)
+    # Apply automatic post-processing fixes
+    corrected = _apply_automatic_accessibility_fixes(corrected)
+    
+    # Fix basic syntax errors
+    corrected = _fix_basic_syntax_errors(corrected)
+    
+    # Fix Angular syntax for ARIA attributes
+    corrected = _fix_angular_aria_syntax(corrected)
 
-    prompt = f"""Fix ALL {total} WCAG A/AA violations in this Angular template.
+    # CRITICAL VALIDATION: ensure LLM returned valid HTML
+    is_valid_response = True
 
-TEMPLATE: {template_path}
+    # 1. Must not be a comment or non-HTML text
+    if corrected.strip().startswith("//") or corrected.strip().startswith("/*"):
+        print(f"[Angular + Axe] ⚠️ LLM returned a comment instead of HTML for {rel_path}")
+        is_valid_response = False
+    
+    # 2. Must contain at least one HTML tag
+    if is_valid_response and not _TAG_RE.search(corrected):
+        print(f"[Angular + Axe] ⚠️ LLM did not return valid HTML for {rel_path}")
+        is_valid_response = False
+    
+    # 3. Must not be significantly shorter than original (>50% shorter)
+    if is_valid_response and len(corrected.strip()) < len(original_content.strip()) * 0.5:
+        print(f"[Angular + Axe] ⚠️ LLM response too short for {rel_path} ({len(corrected)} vs {len(original_content)} chars)")
+        is_valid_response = False
+
+    # Any difference beyond surrounding whitespace counts as a change; the
+    # attribute-level diffs below only feed the diagnostics.
+    has_changes = corrected.strip() != original_content.strip()
+
+    if logger.isEnabledFor(logging.DEBUG):
+        if has_changes:
+            # Detect differences more robustly (colours, ARIA attributes, alt, labels) in one scan per text
+            orig_colors, orig_aria, orig_alt, orig_labels = _extract_diff_features(original_content)
+            corr_colors, corr_aria, corr_alt, corr_labels = _extract_diff_features(corrected)
+            # More robust comparison: normalise spaces but detect real changes
+            normalized_equal = _WS_RE.sub(' ', original_content.strip()) == _WS_RE.sub(' ', corrected.strip())
+        else:
+            # Identical output (a common LLM failure): skip the regex work entirely
+            orig_colors = corr_colors = []
+            orig_aria = corr_aria = orig_alt = corr_alt = orig_labels = corr_labels = set()
+            normalized_equal = True
+
+        logger.debug("[Angular + Axe] 🔍 Change analysis:")
+        logger.debug("  - Normalised code equal: %s", normalized_equal)
+        logger.debug(
+            "  - Color diff: %s (orig: %s, corr: %s)",
+            set(orig_colors) != set(corr_colors), orig_colors, corr_colors,
+        )
+        logger.debug("  - ARIA diff: %s (orig: %d, corr: %d)", orig_aria != corr_aria, len(orig_aria), len(corr_aria))
+        logger.debug("  - alt diff: %s (orig: %d, corr: %d)", orig_alt != corr_alt, len(orig_alt), len(corr_alt))
+        logger.debug(
+            "  - labels diff: %s (orig: %d, corr: %d)",
+            orig_labels != corr_labels, len(orig_labels), len(corr_labels),
+        )
+        logger.debug("  - Has changes: %s", has_changes)
+
+        if not has_changes:
+            logger.debug("[Angular + Axe] ⚠️ NO CHANGES DETECTED - Detailed comparison:")
+            logger.debug("  - Original (first 300): %s", original_content[:300])
+            logger.debug("  - Corrected (first 300): %s", corrected[:300] if corrected else "N/A")
+            logger.debug("  - Original length: %d", len(original_content))
+            logger.debug("  - Corrected length: %d", len(corrected) if corrected else 0)
+
+    if is_valid_response and corrected and has_changes:
+        if is_inline:
+            pending_inline.setdefault(tpl_path, []).append((job, corrected))
+        else:
+            # Verificar que el archivo existe y es escribible
+            if not tpl_path.exists():
+                print(f"[Angular + Axe] ⚠️ File {tpl_path} does not exist. Cannot apply changes.")
+                return
+            
+            # Escribir el archivo
+            try:
+                encoded = _encode_source_text(corrected)
+                tpl_path.write_bytes(encoded)
+                # Verify write succeeded (size check; no need to read the file back)
+                if tpl_path.stat().st_size == len(encoded):
+                    _remember_written_text(tpl_path, corrected)
+                    fixes[rel_path] = {
+                        "original": original_content,
+                        "corrected": corrected,
+                    }
+                    print(f"[Angular + Axe] ✓ Changes applied and verified in {rel_path}")
+                    logger.debug("  → Original length: %d chars", len(original_content))
+                    logger.debug("  → Corrected length: %d chars", len(corrected))
+                else:
+                    print(f"[Angular + Axe] ⚠️ Error: File was not written correctly in {rel_path}")
+            except Exception as e:
+                print(f"[Angular + Axe] ⚠️ Error escribiendo archivo {rel_path}: {e}")
+    else:
+        print(f"[Angular + Axe] ⚠️ LLM returned the same code for {rel_path}")
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
 
-VIOLATIONS:
-{violations_text}
+        # Show which violations were attempted
+        violation_ids = [issue.get("violation", {}).get("id", "unknown") for issue in issues]
+        logger.debug("  → Violations that were attempted: %s", ", ".join(set(violation_ids)))
+        logger.debug("  → Total violations: %d", len(issues))
+        # Mostrar un ejemplo de HTML snippet para debugging
+        for i, issue in enumerate(issues[:3], 1):
+            violation = issue.get("violation", {})
+            node = issue.get("node", {})
+            html_snippet = (node.get("html") or "")[:200]
+            violation_id = violation.get("id", "unknown")
+            logger.debug("  → Violation %d (%s): %s...", i, violation_id, html_snippet)
+
+        # Show what should have been fixed
+        logger.debug("[Angular + Axe] 💡 What should have been fixed:")
+        for issue in issues:
+            violation = issue.get("violation", {})
+            vid = violation.get("id", "unknown").lower()
+            hint = next((hint for key, hint in _HINT_MAP.items() if key in vid), None)
+            if hint:
+                logger.debug("  - %s", hint)
+
+        logger.debug("[Angular + Axe] ⚠️ LLM did not apply fixes. Possible reasons:")
+        logger.debug("  1. Violation element is not in the template (wrong mapping)")
+        logger.debug("  2. LLM did not find the correct element in the code")
+        logger.debug("  3. Prompt was not specific enough")
+        logger.debug("  4. LLM decided no changes needed (incorrect)")
+
+
+def _write_inline_template_fixes(
+    ts_path: Path, edits: List[Tuple[Dict, str]], fixes: Dict[str, Dict[str, str]]
+) -> None:
+    """
+    Splice every corrected inline template of one .ts file in a single rewrite.
 
-QUICK RULES:
-- button-name → add visible text or aria-label="..." to <button>
-- color-contrast → adjust ONLY style="color:#000000" or "#FFFFFF" according to background
-- link-name → add descriptive text or aria-label="..." to <a>
-- image-alt / role-img-alt → add alt="..." or aria-label="..." to the visual element
-- frame-title → add title="..." to <iframe>
-- aria-* → add/fix aria attributes (aria-label, aria-labelledby, etc.)
+    Templates are located once in the current file content and the new file
+    is assembled from the untouched gaps and the replacements, so a component
+    with several inline templates is read and written only once.
+    """
+    ts_content = _read_text(ts_path)
+    inline_matches = list(_INLINE_TEMPLATE_RE.finditer(ts_content))
 
-INSTRUCTIONS:
-- Fix ONLY the elements listed in the violations list.
-- Keep *ngIf, *ngFor, bindings and pipes intact.
-- Do not change layout or responsive classes (row, col-*, container, etc.).
-- Do not add unnecessary new HTML elements; prefer attributes on existing elements.
+    replacements = []
+    for job, corrected in edits:
+        if len(inline_matches) < job["inline_index"]:
+            print(f"[Angular + Axe] ⚠️ Inline template of {job['rel_path']} no longer found. Skipping...")
+            continue
+        match = inline_matches[job["inline_index"] - 1]
+        # Escape backticks inside the corrected template
+        safe_corrected = corrected.replace("`", "\\`")
+        if safe_corrected == match.group(1):
+            print(
+                f"[Angular + Axe] ⚠️ No se aplicaron cambios efectivos en template inline de {job['rel_path']}"
+            )
+            logger.debug("  → New content is identical to original")
+            logger.debug("  → Original (primeros 200): %s", job["original_content"][:200])
+            logger.debug("  → Corregido (primeros 200): %s", corrected[:200])
+            continue
+        replacements.append((match.start(1), match.end(1), safe_corrected, job, corrected))
 
-FULL CURRENT TEMPLATE:
-```html
-{template_content}
-```
+    if not replacements:
+        return
 
-Return ONLY the full corrected template, no explanations."""
+    replacements.sort(key=lambda item: item[0])
+    parts: List[str] = []
+    pos = 0
+    for start, end, safe_corrected, _job, _corrected in replacements:
+        parts.append(ts_content[pos:start])
+        parts.append(safe_corrected)
+        pos = end
+    parts.append(ts_content[pos:])
+    new_ts_content = "".join(parts)
 
-    return prompt.strip()
+    try:
+        encoded = _encode_source_text(new_ts_content)
+        ts_path.write_bytes(encoded)
+        # Verify write succeeded (size check; no need to read the file back)
+        written = ts_path.stat().st_size == len(encoded)
+    except Exception as e:
+        for _start, _end, _safe, job, _corrected in replacements:
+            print(f"[Angular + Axe] ⚠️ Error writing file {job['rel_path']}: {e}")
+        return
+
+    if written:
+        _remember_written_text(ts_path, new_ts_content)
+    for _start, _end, _safe, job, corrected in replacements:
+        rel_path = job["rel_path"]
+        if not written:
+            print(
+                f"[Angular + Axe] ⚠️ Error: File was not written correctly in inline template of {rel_path}"
+            )
+            continue
+        fixes[rel_path] = {
+            "original": job["original_content"],
+            "corrected": corrected,
+        }
+        print(f"[Angular + Axe] ✓ Changes applied and verified in inline template of {rel_path}")
+        logger.debug("  → Original length: %d chars", len(job["original_content"]))
+        logger.debug("  → Corrected length: %d chars", len(corrected))
 
 
 def fix_templates_with_axe_violations(
@@ -706,332 +1861,68 @@ def fix_templates_with_axe_violations(
     Returns a dict:
       { template_rel_path: { "original": ..., "corrected": ... }, ... }
     """
-    import re
     fixes: Dict[str, Dict[str, str]] = {}
 
     if not issues_by_template:
         print("[Angular + Axe] No violations mapped to templates.")
         return fixes
 
+    # Prefetch every source file on a thread pool so the serial preparation
+    # below is served from the read cache instead of one open() at a time.
+    source_paths = {
+        project_root / rel_path.split(_INLINE_TEMPLATE_SUFFIX, 1)[0]
+        for rel_path, issues in issues_by_template.items()
+        if issues
+    }
+    _read_sources_concurrently(list(source_paths))
+
+    jobs: List[Dict] = []
     for rel_path, issues in issues_by_template.items():
+        if not issues:
+            continue
         try:
-            # Support both HTML file templates and INLINE templates in .ts
-            ts_inline_suffix = "::inline_template_"
-            is_inline = ts_inline_suffix in rel_path
-
-            if is_inline:
-                # Example rel_path:
-                #   "src/app/components/ng-style/ng-style.component.ts::inline_template_1"
-                ts_rel, inline_id = rel_path.split(ts_inline_suffix, 1)
-                tpl_path = project_root / ts_rel
-                if not tpl_path.exists():
-                    continue
-                ts_content = tpl_path.read_text(encoding="utf-8")
-
-                # Relocate all template: ` ... ` occurrences
-                inline_matches = list(
-                    re.finditer(
-                        r"template\s*:\s*`([\s\S]*?)`",
-                        ts_content,
-                        flags=re.MULTILINE,
-                    )
-                )
-                if not inline_matches:
-                    continue
-
-                # Compute inline template index (1-based in virtual name)
-                try:
-                    target_idx = int(inline_id)
-                except ValueError:
-                    target_idx = 1
-
-                if target_idx < 1 or target_idx > len(inline_matches):
-                    continue
-
-                match = inline_matches[target_idx - 1]
-                original_content = match.group(1)
-            else:
-                tpl_path = project_root / rel_path
-                if not tpl_path.exists():
-                    continue
-
-                original_content = tpl_path.read_text(encoding="utf-8")
-
-            if not original_content.strip():
-                continue
-
-            # CRITICAL VALIDATION: ensure violations actually belong to this template
-            print(f"[Angular + Axe] 🔍 Validating violation mapping for {rel_path}...")
-            valid_issues = []
-            invalid_issues = []
-            
-            for issue in issues:
-                violation = issue.get("violation", {})
-                node = issue.get("node", {})
-                html_snippet = (node.get("html") or "").strip()
-                violation_id = violation.get("id", "unknown")
-                is_valid = True
-                
-                if html_snippet:
-                    # Extract snippet's main tag
-                    snippet_tag_match = re.search(r'<(\w+)', html_snippet)
-                    if snippet_tag_match:
-                        snippet_tag = snippet_tag_match.group(1)
-                        # Ensure the tag is in the template
-                        if snippet_tag not in ['html', 'body', 'head']:  # Exclude root tags
-                            if f'<{snippet_tag}' not in original_content and f'<{snippet_tag} ' not in original_content:
-                                print(f"[Angular + Axe] ⚠️ Violation {violation_id} has element <{snippet_tag}> not in this template")
-                                print(f"  → HTML snippet: {html_snippet[:150]}...")
-                                print(f"  → This violation will be SKIPPED because mapping looks incorrect")
-                                is_valid = False
-                
-                if is_valid:
-                    valid_issues.append(issue)
-                else:
-                    invalid_issues.append(issue)
-            
-            if invalid_issues:
-                print(f"[Angular + Axe] ⚠️ Skipped {len(invalid_issues)} violation(s) with incorrect mapping")
-            
-            if not valid_issues:
-                print(f"[Angular + Axe] ⚠️ No valid violations to fix in {rel_path}. Skipping...")
-                continue
-            
-            # Use only valid violations
-            issues = valid_issues
-            print(f"[Angular + Axe] ✓ {len(issues)} valid violation(s) to fix in {rel_path}")
-            
-            prompt = _build_axe_based_prompt_for_template(
-                rel_path, original_content, issues
-            )
-
-            system_message = (
-                "You are an EXPERT in web accessibility (WCAG 2.2 A+AA) and Angular. "
-                "Your MISSION is to fix ALL accessibility violations reported by Axe "
-                "by modifying the full HTML template. "
-                "🚨 CRITICAL: You MUST make real changes to the code. Do NOT return the same code. "
-                "🚨 If there are contrast violations, you MUST add or modify style=\"color: #XXXXXX;\" "
-                "🚨 If there are aria-label, button-name, link-name violations, etc., you MUST add the required attributes. "
-                "🚨 Keep Angular logic (bindings, *ngIf, *ngFor, pipes) intact. "
-                "🚨 If you return the same code unchanged, the fix FAILS completely."
-            )
-
-            print(f"[Angular + Axe] Fixing template based on Axe: {rel_path}")
-            
-            # Log prompt for debugging (first 1000 chars)
-            print(f"[Angular + Axe] 📝 Prompt (first 1000 chars): {prompt[:1000]}...")
-            print(f"[Angular + Axe] 📄 Original code (first 500 chars): {original_content[:500]}...")
-
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.0,
-            )
-
-            corrected = response.choices[0].message.content or ""
-            
-            # Log LLM response (first 500 chars)
-            print(f"[Angular + Axe] 📝 LLM response (first 500 chars): {corrected[:500]}...")
-            
-            log_openai_call(
-                prompt=prompt,
-                response=corrected,
-                model="gpt-4o",
-                call_type="angular_axe_template_fix",
-            )
-
-            # Strip possible code block markers
-            corrected = corrected.strip()
-            if corrected.startswith("```"):
-                parts = corrected.split("```")
-                if len(parts) >= 3:
-                    code_block = parts[1]
-                    # Remove possible language tags
-                    if "\n" in code_block:
-                        code_block = code_block.split("\n", 1)[1]
-                    corrected = code_block.strip()
-                else:
-                    corrected = corrected.replace("```html", "").replace("```", "").strip()
+            job = _prepare_axe_template_fix(rel_path, issues, project_root)
+        except Exception as e:
+            print(f"[Angular + Axe] ⚠️ Error fixing {rel_path}: {e}")
+            continue
+        if job:
+            jobs.append(job)
 
-            # Apply automatic post-processing fixes
-            corrected = _apply_automatic_accessibility_fixes(corrected)
-            
-            # Fix basic syntax errors
-            corrected = _fix_basic_syntax_errors(corrected)
-            
-            # Fix Angular syntax for ARIA attributes
-            corrected = _fix_angular_aria_syntax(corrected)
+    if not jobs:
+        return fixes
 
-            # CRITICAL VALIDATION: ensure LLM returned valid HTML
-            is_valid_response = True
+    # Templates are independent: overlap the LLM round-trips, then apply
+    # responses one by one in mapping order so file writes never interleave.
+    # Byte-identical templates with the same violations (generated scaffolds)
+    # share a single request.
+    job_keys = [_template_fix_key(job["original_content"], job["issues"]) for job in jobs]
+    distinct_keys = len(set(job_keys))
+    if distinct_keys < len(jobs):
+        print(
+            f"[Angular + Axe] ♻️ {len(jobs) - distinct_keys} template(s) identical to another one; "
+            f"reusing their LLM fix"
+        )
 
-            # 1. Must not be a comment or non-HTML text
-            if corrected.strip().startswith("//") or corrected.strip().startswith("/*"):
-                print(f"[Angular + Axe] ⚠️ LLM returned a comment instead of HTML for {rel_path}")
-                is_valid_response = False
-            
-            # 2. Must contain at least one HTML tag
-            if is_valid_response and not re.search(r'<\w+', corrected):
-                print(f"[Angular + Axe] ⚠️ LLM did not return valid HTML for {rel_path}")
-                is_valid_response = False
-            
-            # 3. Must not be significantly shorter than original (>50% shorter)
-            if is_valid_response and len(corrected.strip()) < len(original_content.strip()) * 0.5:
-                print(f"[Angular + Axe] ⚠️ LLM response too short for {rel_path} ({len(corrected)} vs {len(original_content)} chars)")
-                is_valid_response = False
-
-            # Detect differences more robustly (including color changes)
-            orig_colors = re.findall(r'color\s*:\s*["\']?([^"\';]+)', original_content, re.IGNORECASE)
-            corr_colors = re.findall(r'color\s*:\s*["\']?([^"\';]+)', corrected, re.IGNORECASE) if corrected else []
-            has_color_diff = set(orig_colors) != set(corr_colors)
-            
-            # More robust comparison: normalise spaces but detect real changes
-            orig_normalized = re.sub(r'\s+', ' ', original_content.strip())
-            corr_normalized = re.sub(r'\s+', ' ', corrected.strip()) if corrected else ""
-            
-            # Detect changes in ARIA attributes, alt, aria-label, etc.
-            orig_aria = set(re.findall(r'aria-\w+="[^"]*"', original_content, re.IGNORECASE))
-            corr_aria = set(re.findall(r'aria-\w+="[^"]*"', corrected, re.IGNORECASE)) if corrected else set()
-            has_aria_diff = orig_aria != corr_aria
-            
-            orig_alt = set(re.findall(r'alt="[^"]*"', original_content, re.IGNORECASE))
-            corr_alt = set(re.findall(r'alt="[^"]*"', corrected, re.IGNORECASE)) if corrected else set()
-            has_alt_diff = orig_alt != corr_alt
-            
-            orig_labels = set(re.findall(r'<label[^>]*>', original_content, re.IGNORECASE))
-            corr_labels = set(re.findall(r'<label[^>]*>', corrected, re.IGNORECASE)) if corrected else set()
-            has_label_diff = orig_labels != corr_labels
-            
-            has_changes = (
-                orig_normalized != corr_normalized or 
-                has_color_diff or
-                has_aria_diff or
-                has_alt_diff or
-                has_label_diff or
-                corrected.strip() != original_content.strip()
-            )
-            
-            # Debug: show whether there are changes
-            print(f"[Angular + Axe] 🔍 Change analysis:")
-            print(f"  - Normalised code equal: {orig_normalized == corr_normalized}")
-            print(f"  - Color diff: {has_color_diff} (orig: {orig_colors}, corr: {corr_colors})")
-            print(f"  - ARIA diff: {has_aria_diff} (orig: {len(orig_aria)}, corr: {len(corr_aria)})")
-            print(f"  - alt diff: {has_alt_diff} (orig: {len(orig_alt)}, corr: {len(corr_alt)})")
-            print(f"  - labels diff: {has_label_diff} (orig: {len(orig_labels)}, corr: {len(corr_labels)})")
-            print(f"  - Has changes: {has_changes}")
-            
-            if not has_changes:
-                print(f"[Angular + Axe] ⚠️ NO CHANGES DETECTED - Detailed comparison:")
-                print(f"  - Original (first 300): {original_content[:300]}")
-                print(f"  - Corrected (first 300): {corrected[:300] if corrected else 'N/A'}")
-                print(f"  - Original length: {len(original_content)}")
-                print(f"  - Corrected length: {len(corrected) if corrected else 0}")
-            
-            if is_valid_response and corrected and has_changes:
-                if has_color_diff:
-                    print(f"[Angular + Axe] 🎨 Color difference detected: {orig_colors} -> {corr_colors}")
-                if is_inline:
-                    # Replace only the inline template content inside the .ts file
-                    before = ts_content[: match.start(1)]
-                    after = ts_content[match.end(1) :]
-
-                    # Escape backticks inside the corrected template
-                    safe_corrected = corrected.replace("`", "\\`")
-
-                    new_ts_content = before + safe_corrected + after
-                    if new_ts_content != ts_content:
-                        try:
-                            tpl_path.write_text(new_ts_content, encoding="utf-8")
-                            # Verify write succeeded
-                            written_content = tpl_path.read_text(encoding="utf-8")
-                            if written_content.strip() == new_ts_content.strip():
-                                fixes[rel_path] = {
-                                    "original": original_content,
-                                    "corrected": corrected,
-                                }
-                                print(
-                                    f"[Angular + Axe] ✓ Changes applied and verified in inline template of {rel_path}"
-                                )
-                                print(f"  → Original length: {len(original_content)} chars")
-                                print(f"  → Corrected length: {len(corrected)} chars")
-                            else:
-                                print(
-                                    f"[Angular + Axe] ⚠️ Error: File was not written correctly in inline template of {rel_path}"
-                                )
-                        except Exception as e:
-                            print(f"[Angular + Axe] ⚠️ Error writing file {rel_path}: {e}")
-                    else:
-                        print(
-                            f"[Angular + Axe] ⚠️ No se aplicaron cambios efectivos en template inline de {rel_path}"
-                        )
-                        print(f"  → New content is identical to original")
-                        print(f"  → Original (primeros 200): {original_content[:200]}")
-                        print(f"  → Corregido (primeros 200): {corrected[:200]}")
-                else:
-                    # Verificar que el archivo existe y es escribible
-                    if not tpl_path.exists():
-                        print(f"[Angular + Axe] ⚠️ File {tpl_path} does not exist. Cannot apply changes.")
-                        continue
-                    
-                    # Escribir el archivo
-                    try:
-                        tpl_path.write_text(corrected, encoding="utf-8")
-                        # Verify write succeeded
-                        written_content = tpl_path.read_text(encoding="utf-8")
-                        if written_content.strip() == corrected.strip():
-                            fixes[rel_path] = {
-                                "original": original_content,
-                                "corrected": corrected,
-                            }
-                            print(f"[Angular + Axe] ✓ Changes applied and verified in {rel_path}")
-                            print(f"  → Original length: {len(original_content)} chars")
-                            print(f"  → Corrected length: {len(corrected)} chars")
-                        else:
-                            print(f"[Angular + Axe] ⚠️ Error: File was not written correctly in {rel_path}")
-                    except Exception as e:
-                        print(f"[Angular + Axe] ⚠️ Error escribiendo archivo {rel_path}: {e}")
-            else:
-                print(f"[Angular + Axe] ⚠️ LLM returned the same code for {rel_path}")
-                # Show which violations were attempted
-                violation_ids = [issue.get("violation", {}).get("id", "unknown") for issue in issues]
-                print(f"  → Violations that were attempted: {', '.join(set(violation_ids))}")
-                print(f"  → Total violations: {len(issues)}")
-                # Mostrar un ejemplo de HTML snippet para debugging
-                if issues:
-                    for i, issue in enumerate(issues[:3], 1):
-                        violation = issue.get("violation", {})
-                        node = issue.get("node", {})
-                        html_snippet = (node.get("html") or "")[:200]
-                        violation_id = violation.get("id", "unknown")
-                        print(f"  → Violation {i} ({violation_id}): {html_snippet}...")
-                
-                # Show what should have been fixed
-                print(f"[Angular + Axe] 💡 What should have been fixed:")
-                for issue in issues:
-                    violation = issue.get("violation", {})
-                    violation_id = violation.get("id", "unknown")
-                    if "button-name" in violation_id.lower():
-                        print(f"  - Add aria-label or visible text to <button>")
-                    elif "color-contrast" in violation_id.lower():
-                        print(f"  - Add/modify style=\"color: #XXXXXX;\"")
-                    elif "link-name" in violation_id.lower():
-                        print(f"  - Add descriptive text or aria-label to <a>")
-                    elif "aria" in violation_id.lower():
-                        print(f"  - Add/modify aria-* attributes")
-                    elif "alt" in violation_id.lower() or "image" in violation_id.lower():
-                        print(f"  - Add/modify alt attribute on <img>")
-                
-                print(f"[Angular + Axe] ⚠️ LLM did not apply fixes. Possible reasons:")
-                print(f"  1. Violation element is not in the template (wrong mapping)")
-                print(f"  2. LLM did not find the correct element in the code")
-                print(f"  3. Prompt was not specific enough")
-                print(f"  4. LLM decided no changes needed (incorrect)")
+    pending_inline: Dict[Path, List[Tuple[Dict, str]]] = {}
+    workers = min(MAX_TEMPLATE_FIX_WORKERS, distinct_keys)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        requests_by_key = {}
+        for job, key in zip(jobs, job_keys):
+            if key not in requests_by_key:
+                requests_by_key[key] = executor.submit(_request_axe_template_fix, client, job["prompt"])
+        futures = [requests_by_key[key] for key in job_keys]
+        for job, future in zip(jobs, futures):
+            try:
+                _apply_axe_template_fix(job, future.result(), fixes, pending_inline)
+            except Exception as e:
+                print(f"[Angular + Axe] ⚠️ Error fixing {job['rel_path']}: {e}")
 
+    # Inline templates sharing a .ts file are spliced in with one rewrite per file
+    for ts_path, edits in pending_inline.items():
+        try:
+            _write_inline_template_fixes(ts_path, edits, fixes)
         except Exception as e:
-            print(f"[Angular + Axe] ⚠️ Error fixing {rel_path}: {e}")
+            print(f"[Angular + Axe] ⚠️ Error fixing inline templates of {ts_path}: {e}")
 
     return fixes
 
@@ -1115,74 +2006,55 @@ def process_angular_project(project_path: str, client, run_path: str, serve_app:
     
     if serve_app:
         try:
-            import time
-            import socket
-            from urllib.request import urlopen
-            from urllib.error import URLError
-            
             base_url = "http://localhost:4200"
             
             # First check if server is already running
-            server_running = False
-            try:
-                response = urlopen(base_url, timeout=2)
-                server_running = True
+            server_running = _probe_dev_server("localhost", 4200, timeout=2)
+            if server_running:
                 print(f"  → Angular server already running at {base_url}")
-            except (URLError, socket.timeout):
+            else:
                 print(f"  → Angular server not running, starting it...")
                 # Iniciar el servidor Angular antes de ejecutar Axe
                 dev_server_process = _start_angular_dev_server(project_root, port=4200, wait_for_ready=True)
                 if dev_server_process:
                     print(f"  → Waiting for server to be ready...")
                     # Wait until server is ready
-                    max_wait = 120  # 2 minutes max
-                    wait_interval = 2
-                    waited = 0
-                    while waited < max_wait:
-                        try:
-                            response = urlopen(base_url, timeout=2)
-                            server_running = True
-                            print(f"  ✓ Angular server ready at {base_url}")
-                            break
-                        except (URLError, socket.timeout):
-                            time.sleep(wait_interval)
-                            waited += wait_interval
-                            print(f"  → Esperando... ({waited}s)")
-                    
-                    if not server_running:
-                        print(f"  ⚠️ Could not connect to server after {max_wait}s")
+                    server_running = _wait_for_dev_server("localhost", 4200, DEV_SERVER_MAX_WAIT)
+                    if server_running:
+                        print(f"  ✓ Angular server ready at {base_url}")
+                    else:
+                        print(f"  ⚠️ Could not connect to server after {DEV_SERVER_MAX_WAIT}s")
                         print("  → Continuing with static code analysis...")
             
             # Run Axe if server is running
             if server_running:
                 print("  → Running Axe on Angular application...")
                 try:
-                    driver = setup_driver()
-                    driver.get(base_url)
-                    time.sleep(5)  # Wait for page to load fully
+                    with _driver_scope() as driver:
+                        driver.get(base_url)
+                        time.sleep(5)  # Wait for page to load fully
                     
-                    # Take screenshots automatically (before fixes)
-                    print("  → Taking screenshots at different sizes...")
-                    screenshots_dir = Path(run_path) / "screenshots" / "before"
-                    screenshot_paths = take_screenshots(
-                        driver,
-                        base_url,
-                        screenshots_dir,
-                        prefix="before"
-                    )
-                    if screenshot_paths:
-                        print(f"  ✓ {len(screenshot_paths)} capturas guardadas")
-                        # Crear resumen HTML de las capturas
-                        summary_path = screenshots_dir / "summary.html"
-                        create_screenshot_summary(screenshot_paths, summary_path)
-                        print(f"  ✓ Resumen visual guardado en: {summary_path}")
-                        print(f"  → Screenshots will be included in the LLM prompt for better visual context")
-                    else:
-                        screenshot_paths = []  # Ensure it's an empty list
+                        # Take screenshots automatically (before fixes)
+                        print("  → Taking screenshots at different sizes...")
+                        screenshots_dir = Path(run_path) / "screenshots" / "before"
+                        screenshot_paths = take_screenshots(
+                            driver,
+                            base_url,
+                            screenshots_dir,
+                            prefix="before"
+                        )
+                        if screenshot_paths:
+                            print(f"  ✓ {len(screenshot_paths)} capturas guardadas")
+                            # Crear resumen HTML de las capturas
+                            summary_path = screenshots_dir / "summary.html"
+                            create_screenshot_summary(screenshot_paths, summary_path)
+                            print(f"  ✓ Resumen visual guardado en: {summary_path}")
+                            print(f"  → Screenshots will be included in the LLM prompt for better visual context")
+                        else:
+                            screenshot_paths = []  # Ensure it's an empty list
                     
-                    # Run Axe analysis
-                    axe_results = run_axe_analysis(driver, base_url, is_local_file=False)
-                    driver.quit()
+                        # Run Axe analysis
+                        axe_results = run_axe_analysis(driver, base_url, is_local_file=False)
                     
                     # Guardar las rutas de capturas para usarlas en el procesamiento de componentes
                     # (will be stored in a variable to pass to components)
@@ -1194,8 +2066,7 @@ def process_angular_project(project_path: str, client, run_path: str, serve_app:
                         
                         # Guardar reporte de Axe en el directorio de resultados
                         axe_report_path = Path(run_path) / "angular_axe_report.json"
-                        with open(axe_report_path, "w", encoding="utf-8") as f:
-                            json.dump(axe_results, f, indent=2, ensure_ascii=False)
+                        write_json_file(axe_report_path, axe_results)
                         print(f"  ✓ Reporte de Axe guardado en: {axe_report_path}")
                     else:
                         print("  ⚠️ Axe reported no violations (may be no errors or page did not load)")
@@ -1210,46 +2081,64 @@ def process_angular_project(project_path: str, client, run_path: str, serve_app:
     
     # FASE 3: Procesar componentes y generar mapa de cambios de accesibilidad (sandbox)
     print(f"\n[Fase 3] Generando mapa de cambios de accesibilidad en sandbox...")
-    for template_path in templates:
-        try:
-            # Get Axe errors for this specific template
-            template_rel_path = str(template_path.relative_to(project_root))
-            axe_errors_for_template = issues_by_template.get(template_rel_path, [])
-            
-            # Get screenshot paths if available
-            screenshot_paths_for_component = []
-            if screenshot_paths:
-                # Por ahora, pasamos todas las capturas a cada componente
-                # Could filter by component in the future if needed
-                screenshot_paths_for_component = screenshot_paths
-            
-            component_result, changes = _process_single_component_sandbox(
-                template_path, client, project_root, axe_errors_for_template, screenshot_paths_for_component
-            )
-            processed_components.append(component_result)
-            if changes:
-                changes_map.append({
-                    "component": component_result["component_name"],
-                    "template_path": str(template_path),
-                    "changes": changes
-                })
-            if component_result["status"] == "updated":
-                stats["updated"] += 1
-            relative_template = Path(component_result["template_path"]).relative_to(project_root)
-            summary_lines.append(f"✓ {relative_template} -> {component_result['status']}")
-        except Exception as exc:
-            stats["errors"] += 1
-            relative_path = template_path.relative_to(project_root)
-            error_msg = f"✗ {relative_path} - Error: {exc}"
-            summary_lines.append(error_msg)
-            processed_components.append(
-                {
-                    "component_name": template_path.stem.replace(".component", ""),
-                    "template_path": str(relative_path),
-                    "status": "error",
-                    "error": str(exc),
-                }
+    # Resolve every template's relative path once and key the Axe issues the
+    # same way, so each lookup below is a plain dict hit.
+    rel_paths = {template_path: template_path.relative_to(project_root) for template_path in templates}
+    issues_by_posix_path = {Path(rel).as_posix(): issues for rel, issues in issues_by_template.items()}
+
+    # Get screenshot paths if available
+    screenshot_paths_for_component = []
+    if screenshot_paths:
+        # Por ahora, pasamos todas las capturas a cada componente
+        # Could filter by component in the future if needed
+        screenshot_paths_for_component = screenshot_paths
+
+    # The sandbox only reads sources and queries the LLM, so components run
+    # concurrently; results are collected in template order below.
+    # Each component's console output is buffered and printed as one block
+    # when it finishes, so concurrent components do not interleave.
+    workers = max(1, min(MAX_SANDBOX_WORKERS, len(templates)))
+    with _thread_buffered_stdout() as buffered_stdout, \
+            ThreadPoolExecutor(max_workers=workers) as sandbox_executor:
+        sandbox_futures = [
+            sandbox_executor.submit(
+                buffered_stdout.run,
+                _process_single_component_sandbox,
+                template_path,
+                client,
+                project_root,
+                # Get Axe errors for this specific template
+                issues_by_posix_path.get(rel_paths[template_path].as_posix(), []),
+                screenshot_paths_for_component,
             )
+            for template_path in templates
+        ]
+        for template_path, future in zip(templates, sandbox_futures):
+            relative_path = rel_paths[template_path]
+            try:
+                component_result, changes = future.result()
+                processed_components.append(component_result)
+                if changes:
+                    changes_map.append({
+                        "component": component_result["component_name"],
+                        "template_path": str(template_path),
+                        "changes": changes
+                    })
+                if component_result["status"] == "updated":
+                    stats["updated"] += 1
+                summary_lines.append(f"✓ {relative_path} -> {component_result['status']}")
+            except Exception as exc:
+                stats["errors"] += 1
+                error_msg = f"✗ {relative_path} - Error: {exc}"
+                summary_lines.append(error_msg)
+                processed_components.append(
+                    {
+                        "component_name": template_path.stem.replace(".component", ""),
+                        "template_path": str(relative_path),
+                        "status": "error",
+                        "error": str(exc),
+                    }
+                )
 
     # PHASE 4: Apply accessibility changes to actual source code
     print(f"\n[Phase 4] Applying {len(changes_map)} accessibility changes to source code...")
@@ -1294,16 +2183,26 @@ def process_angular_project(project_path: str, client, run_path: str, serve_app:
     }
 
     report_path = Path(run_path) / "angular_summary.json"
-    with open(report_path, "w", encoding="utf-8") as report_file:
-        json.dump(report_payload, report_file, indent=2, ensure_ascii=False)
+    write_json_file(report_path, report_payload)
 
     headline = f"Componentes encontrados: {stats['templates']} | Actualizados: {stats['updated']} | Errores: {stats['errors']}"
     return [headline, "-" * len(headline), *summary_lines, f"Resumen guardado en {report_path}"]
 
 
 def _load_angular_config(config_path: Path) -> Dict:
-    with open(config_path, "r", encoding="utf-8") as config_file:
-        return json.load(config_file)
+    """
+    Parse angular.json, reusing the parsed dict while the file's (mtime, size) match.
+
+    Callers only read the returned config; it must not be mutated.
+    """
+    key = str(config_path)
+    stat = config_path.stat()
+    cached = _angular_config_cache.get(key)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    config = read_json_file(config_path)
+    _angular_config_cache[key] = (stat.st_mtime_ns, stat.st_size, config)
+    return config
 
 
 def _get_default_project_name(project_root: Path) -> Optional[str]:
@@ -1317,36 +2216,81 @@ def _get_default_project_name(project_root: Path) -> Optional[str]:
     
     try:
         config = _load_angular_config(angular_config)
-        projects = config.get("projects", {})
-        
-        # Si solo hay un proyecto, no hace falta especificarlo
-        if len(projects) <= 1:
-            return None
-        
-        # Buscar proyecto por defecto
-        default_project = config.get("defaultProject")
-        if default_project and default_project in projects:
-            return default_project
-        
-        # Si no hay defaultProject, buscar el primer proyecto con architect.build
-        for name, proj_config in projects.items():
-            architect = proj_config.get("architect", {})
-            if "build" in architect:
-                return name
-        
-        # Fallback: primer proyecto
-        return list(projects.keys())[0] if projects else None
     except Exception:
         return None
 
+    key = str(project_root)
+    cached = _default_project_cache.get(key)
+    if cached is not None and cached[0] is config:
+        return cached[1]
+
+    try:
+        default_project = _select_default_project(config)
+    except Exception:
+        return None
+    _default_project_cache[key] = (config, default_project)
+    return default_project
+
+
+def _select_default_project(config: Dict) -> Optional[str]:
+    projects = config.get("projects", {})
+    
+    # Si solo hay un proyecto, no hace falta especificarlo
+    if len(projects) <= 1:
+        return None
+    
+    # Buscar proyecto por defecto
+    default_project = config.get("defaultProject")
+    if default_project and default_project in projects:
+        return default_project
+    
+    # Si no hay defaultProject, buscar el primer proyecto con architect.build
+    for name, proj_config in projects.items():
+        architect = proj_config.get("architect", {})
+        if "build" in architect:
+            return name
+    
+    # Fallback: primer proyecto
+    return list(projects.keys())[0] if projects else None
+
 
 def _resolve_source_roots(project_root: Path, config: Dict) -> List[Path]:
+    key = str(project_root)
+    cached = _source_roots_cache.get(key)
+    if cached is not None and cached[0] is config:
+        return list(cached[1])
+    source_roots = _scan_source_roots(project_root, config)
+    _source_roots_cache[key] = (config, tuple(source_roots))
+    return source_roots
+
+
+def _scan_source_roots(project_root: Path, config: Dict) -> List[Path]:
     projects = config.get("projects", {})
     if not projects:
         return []
 
     source_roots: List[Path] = []
 
+    # One listing of the workspace root answers the common single-segment
+    # sourceRoot ("src") without a stat; other roots are stat-ed once each.
+    try:
+        with os.scandir(project_root) as entries:
+            top_names = {entry.name for entry in entries}
+    except OSError:
+        top_names = None
+    exists_cache: Dict[str, bool] = {}
+
+    def _source_exists(source_root: str) -> bool:
+        rel = Path(source_root)
+        parts = rel.parts
+        # An exact-case hit on a top-level entry is answered from the listing;
+        # anything else falls back to the filesystem, which may be case-insensitive.
+        if top_names is not None and len(parts) == 1 and not rel.is_absolute() and parts[0] in top_names:
+            return True
+        if source_root not in exists_cache:
+            exists_cache[source_root] = (project_root / source_root).exists()
+        return exists_cache[source_root]
+
     default_project = config.get("defaultProject")
     project_names = [default_project] if default_project else []
     project_names.extend([name for name in projects.keys() if name not in project_names])
@@ -1356,25 +2300,160 @@ def _resolve_source_roots(project_root: Path, config: Dict) -> List[Path]:
         source_root = project_config.get("sourceRoot") or project_config.get("root")
         if not source_root:
             continue
-        source_path = project_root / source_root
-        if source_path.exists():
-            source_roots.append(source_path)
+        if _source_exists(source_root):
+            source_roots.append(project_root / source_root)
 
     # fallback: typical src/ directory
-    fallback_src = project_root / "src"
-    if not source_roots and fallback_src.exists():
-        source_roots.append(fallback_src)
+    if not source_roots and _source_exists("src"):
+        source_roots.append(project_root / "src")
 
     return source_roots
 
 
+def _walk_components(root: Path) -> Iterator[Path]:
+    """Yield the *.component.html files under root, skipping build/vendor directories."""
+    for path in _iter_source_files([root]):
+        if path.endswith(".component.html"):
+            yield Path(path)
+
+
 def _discover_component_templates(source_roots: List[Path]) -> List[Path]:
-    templates: List[Path] = []
-    for root in source_roots:
-        templates.extend(root.glob("**/*.component.html"))
+    if len(source_roots) < 2:
+        return sorted(set(_walk_components(source_roots[0]))) if source_roots else []
+    # Multi-project workspaces: walk each root on its own thread (scandir releases the GIL)
+    with ThreadPoolExecutor(max_workers=min(MAX_ROOT_WALK_WORKERS, len(source_roots))) as executor:
+        per_root = executor.map(lambda root: list(_walk_components(root)), source_roots)
+        templates = set(chain.from_iterable(per_root))
     return sorted(templates)
 
 
+def _cached_chat_completion(
+    client, messages: List[Dict], model: str, temperature: float
+) -> Tuple[str, Optional[Path]]:
+    """
+    Return the completion text for messages, reusing a response stored on disk.
+
+    The key hashes the serialised messages (image data URLs included, so a
+    changed screenshot changes the key), the model and the temperature.
+
+    A fresh response is not persisted here: the second item is the cache
+    path to hand to _store_cached_completion once the caller has validated
+    the text (None when caching is off or the text came from the cache).
+    """
+    cache_path = None
+    if ENABLE_LLM_DISK_CACHE:
+        if orjson is not None:
+            payload = orjson.dumps(messages, default=str, option=orjson.OPT_SORT_KEYS)
+        else:
+            payload = json.dumps(messages, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+        key = hashlib.blake2b(
+            f"{model}\n{temperature}\n".encode("utf-8") + payload, digest_size=16
+        ).hexdigest()
+        cache_path = Path(CACHE_DIR) / f"llm-{key}.txt"
+        if cache_path.exists():
+            return cache_path.read_text(encoding="utf-8"), None
+
+    response = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=temperature,
+    )
+    response_text = response.choices[0].message.content or ""
+    return response_text, cache_path if response_text else None
+
+
+def _store_cached_completion(cache_path: Optional[Path], response_text: str) -> None:
+    """Persist a validated completion returned by _cached_chat_completion."""
+    if cache_path is None:
+        return
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        _write_text_atomic(cache_path, response_text)
+    except OSError as exc:
+        print(f"  ⚠️ Could not persist LLM response to cache: {exc}")
+
+
+def _load_screenshot_data_url(screenshot_path: str) -> Optional[str]:
+    """
+    Return a screenshot as a base64 data URL, or None if the file is missing.
+
+    The same before-fix screenshots go to every component's prompt, so each
+    file is read and encoded once while its (mtime, size) stay the same.
+    """
+    screenshot_file = Path(screenshot_path)
+    try:
+        stat = screenshot_file.stat()
+    except FileNotFoundError:
+        return None
+    cached = _screenshot_data_url_cache.get(screenshot_path)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    # Determine MIME type from extension
+    mime_type = "image/png"  # Por defecto PNG
+    if screenshot_path.endswith('.jpg') or screenshot_path.endswith('.jpeg'):
+        mime_type = "image/jpeg"
+    if stat.st_size:
+        # Encode straight from the page cache instead of copying the file into a bytes object first
+        with open(screenshot_file, "rb") as img_file, mmap.mmap(img_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            image_base64 = base64.b64encode(mapped).decode('ascii')
+    else:
+        image_base64 = ""
+    data_url = f"data:{mime_type};base64,{image_base64}"
+    _screenshot_data_url_cache[screenshot_path] = (stat.st_mtime_ns, stat.st_size, data_url)
+    return data_url
+
+
+class _ThreadBufferedStdout:
+    """
+    sys.stdout proxy that diverts print() from threads running under run()
+    into a per-thread buffer; other threads write straight through.
+    """
+
+    def __init__(self, target):
+        self._target = target
+        self._local = threading.local()
+        self._flush_lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            return self._target.write(text)
+        buffer.append(text)
+        return len(text)
+
+    def flush(self) -> None:
+        if getattr(self._local, "buffer", None) is None:
+            self._target.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+    def run(self, fn, *args, **kwargs):
+        """Call fn, then print everything it wrote as one contiguous block."""
+        self._local.buffer = []
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            output = "".join(self._local.buffer)
+            self._local.buffer = None
+            if output:
+                with self._flush_lock:
+                    self._target.write(output)
+                    self._target.flush()
+
+
+@contextmanager
+def _thread_buffered_stdout():
+    """Install a _ThreadBufferedStdout as sys.stdout for the duration of the block."""
+    proxy = _ThreadBufferedStdout(sys.stdout)
+    sys.stdout = proxy
+    try:
+        yield proxy
+    finally:
+        sys.stdout = proxy._target
+
+
 def _process_single_component_sandbox(
     template_path: Path, client, project_root: Path, axe_errors: List[Dict] = None, screenshot_paths: List[str] = None
 ) -> Tuple[Dict, Optional[Dict]]:
@@ -1392,26 +2471,37 @@ def _process_single_component_sandbox(
     """
     base_component_name = template_path.stem.replace(".component", "")
     component_dir = template_path.parent
+    # Header for this component's (buffered) block of console output
+    print(f"\n[Sandbox] {base_component_name} ({template_path.name})")
 
-    ts_path = component_dir / (template_path.name.replace(".html", ".ts"))
-    styles_candidates = [
-        component_dir / (template_path.name.replace(".html", ".scss")),
-        component_dir / (template_path.name.replace(".html", ".sass")),
-        component_dir / (template_path.name.replace(".html", ".css")),
-    ]
-    style_path = next((path for path in styles_candidates if path.exists()), None)
+    # One directory listing answers every "does the sibling file exist" question
+    base_name = template_path.name.replace(".html", "")
+    try:
+        with os.scandir(component_dir) as entries:
+            sibling_names = {entry.name for entry in entries}
+    except OSError:
+        sibling_names = set()
+
+    ts_path = component_dir / f"{base_name}.ts"
+    ts_exists = ts_path.name in sibling_names
+    style_path = next(
+        (component_dir / f"{base_name}{ext}" for ext in (".scss", ".sass", ".css") if f"{base_name}{ext}" in sibling_names),
+        None,
+    )
 
-    template_content = template_path.read_text(encoding="utf-8")
-    ts_content = ts_path.read_text(encoding="utf-8") if ts_path.exists() else None
-    style_content = style_path.read_text(encoding="utf-8") if style_path and style_path.exists() else None
+    # Read template, .ts and styles together (served from the source cache when warm)
+    template_content, ts_content, style_content = _read_sources_concurrently(
+        [template_path, ts_path if ts_exists else None, style_path]
+    )
+    if template_content is None:
+        # Surface the real read error for this component
+        template_content = _read_text(template_path)
 
     # Analyse template for obvious errors before sending to LLM
     detected_errors = _analyze_template_for_accessibility_errors(template_content, style_content)
     
     # Convert Axe errors to a readable format for the prompt
-    axe_errors_formatted = []
     if axe_errors:
-        import re
         print(f"  → {len(axe_errors)} Axe errors detected for this component")
         for axe_error in axe_errors:
             # Extract info from Axe structure
@@ -1454,12 +2544,11 @@ def _process_single_component_sandbox(
                 if not contrast_info:
                     failure_summary = node.get("failureSummary", "")
                     if failure_summary:
-                        import re
                         # Extract ratio from error message (format: "contrast of 3.33")
-                        ratio_match = re.search(r'contrast of ([\d.]+)', failure_summary, re.IGNORECASE)
-                        expected_match = re.search(r'Expected contrast ratio of ([\d.]+:?[\d]*)', failure_summary, re.IGNORECASE)
-                        fg_match = re.search(r'foreground color: (#[0-9a-fA-F]+)', failure_summary, re.IGNORECASE)
-                        bg_match = re.search(r'background color: (#[0-9a-fA-F]+)', failure_summary, re.IGNORECASE)
+                        ratio_match = _RE_CONTRAST.search(failure_summary)
+                        expected_match = _RE_EXPECTED.search(failure_summary)
+                        fg_match = _RE_FG.search(failure_summary)
+                        bg_match = _RE_BG.search(failure_summary)
                         
                         if ratio_match or expected_match:
                             ratio_str = ratio_match.group(1) if ratio_match else "N/A"
@@ -1473,11 +2562,10 @@ def _process_single_component_sandbox(
                         for check in checks:
                             message = check.get("message", "")
                             if "contrast" in message.lower() and ("insufficient" in message.lower() or "ratio" in message.lower()):
-                                import re
-                                ratio_match = re.search(r'contrast of ([\d.]+)', message, re.IGNORECASE)
-                                expected_match = re.search(r'Expected contrast ratio of ([\d.]+:?[\d]*)', message, re.IGNORECASE)
-                                fg_match = re.search(r'foreground color: (#[0-9a-fA-F]+)', message, re.IGNORECASE)
-                                bg_match = re.search(r'background color: (#[0-9a-fA-F]+)', message, re.IGNORECASE)
+                                ratio_match = _RE_CONTRAST.search(message)
+                                expected_match = _RE_EXPECTED.search(message)
+                                fg_match = _RE_FG.search(message)
+                                bg_match = _RE_BG.search(message)
                                 
                                 if ratio_match:
                                     ratio_str = ratio_match.group(1)
@@ -1507,14 +2595,13 @@ def _process_single_component_sandbox(
             
             if html_display:
                 # Strip Angular runtime attributes for display
-                clean_html = re.sub(r'\s+_ngcontent-[^=]*="[^"]*"', '', html_display)
-                clean_html = re.sub(r'\s+_nghost-[^=]*="[^"]*"', '', clean_html)
+                clean_html = _RE_NG_ATTR.sub('', html_display)
                 error_parts.append(f"HTML afectado: {clean_html}")
                 
                 # Si el HTML es un span con clase mdc-button__label, advertir que es generado
                 if "mdc-button__label" in clean_html or "mat-button-label" in clean_html:
                     # Try to extract button text to help locate it
-                    text_match = re.search(r'>\s*([^<]+)\s*<', clean_html)
+                    text_match = _RE_BUTTON_TEXT.search(clean_html)
                     if text_match:
                         button_text = text_match.group(1).strip()
                         error_parts.append(f"⚠️ NOTE: This span is generated by Angular Material. Find the button that contains the text '{button_text}' in the template.")
@@ -1522,49 +2609,34 @@ def _process_single_component_sandbox(
             if help_text:
                 error_parts.append(f"Ayuda: {help_text}")
             
-            error_msg = " | ".join(error_parts)
-            
-            axe_errors_formatted.append(error_msg)
-            detected_errors.append(error_msg)  # Also add to detected_errors so they are included in the prompt
+            # Also add to detected_errors so they are included in the prompt
+            detected_errors.append(" | ".join(error_parts))
     
     if detected_errors:
         print(f"  → Total de {len(detected_errors)} errores de accesibilidad detectados en {base_component_name}")
-        for error in detected_errors[:5]:
-            print(f"    - {error[:80]}")
-    else:
+        if logger.isEnabledFor(logging.DEBUG):
+            for error in detected_errors[:5]:
+                logger.debug("    - %s", error[:80])
+    elif FORCE_LLM_SCAN:
         print(f"  → No obvious errors detected in {base_component_name} (LLM should look deeper)")
+    else:
+        # Nothing found statically and no Axe errors: skip the LLM round-trip
+        print(f"  → No errors detected in {base_component_name}; skipping LLM (set FORCE_LLM_SCAN=1 to scan anyway)")
+        return {
+            "component_name": base_component_name,
+            "template_path": str(template_path),
+            "typescript_path": str(ts_path) if ts_exists else None,
+            "styles_path": str(style_path) if style_path else None,
+            "status": "unchanged",
+            "changes": {"template": False, "typescript": False, "styles": False},
+        }, None
 
-    system_message = (
-        "You are an EXPERT WEB ACCESSIBILITY AUDITOR and Angular developer. Your CRITICAL MISSION is: "
-        "1) THOROUGHLY ANALYSE every line of code to find ALL accessibility errors (WCAG 2.2 A+AA), "
-        "2) FIX EVERY ERROR found WITHOUT EXCEPTION, even if it requires significant changes. "
-        "You MUST ACTIVELY LOOK FOR: buttons/links without visible text or aria-label, inputs without labels, images without alt, "
-        "contrast issues, missing keyboard support, incorrect heading hierarchy, lists without structure, etc. "
-        "🚨🚨🚨 CRITICAL ON CONTRAST: If contrast errors are detected or you find elements with text that may have low contrast, "
-        "you MUST fix ALL contrast errors by adjusting text and/or background colour to meet WCAG (4.5:1 for normal text, 3:1 for large text). "
-        "On light backgrounds, use dark text colour (#000000, #212121, etc.); on dark backgrounds, use light text (#FFFFFF, #F5F5F5, etc.). "
-        "Do NOT fix just one, fix ALL. If there are 3 contrast errors, fix all 3. "
-        "🚨🚨🚨 CRITICAL ON RESPONSIVE DESIGN: "
-        "- PRESERVE ALL existing responsive styles (media queries, responsive classes, flexbox, grid, etc.) "
-        "- Do NOT change display:none to display:block unless absolutely necessary for accessibility "
-        "- If a label has display:none, it is visually hidden but accessible to screen readers - use sr-only or aria-label instead "
-        "- Do NOT add inline styles that break responsive design (fixed width, fixed height, excessive margin/padding, etc.) "
-        "- Keep all Bootstrap/CSS framework classes (col-sm-*, col-md-*, etc.) "
-        "- Do NOT modify layout properties like display, position, flex, grid, width, height, margin, padding unless critical for accessibility "
-        "🚨🚨🚨 CRITICAL ON SCREENSHOTS (if provided): "
-        "If screenshots are provided in the user message, you MUST examine them in detail. "
-        "These screenshots show how the application REALLY looks at different screen sizes. "
-        "YOUR GOAL: Fix ALL accessibility errors BUT preserve EXACTLY the visual design you see in the screenshots. "
-        "Fixes should be visually 'invisible' - use aria-label, roles, alt text, and minimal contrast adjustments. "
-        "The final result must look IDENTICAL to the screenshots, but accessible. "
-        "IMPORTANT: If the code has ANY accessibility issue, you MUST fix it. "
-        "Do NOT return the original code unchanged. ALWAYS look for and fix errors. "
-        "Accessibility IS IMPORTANT AND MUST BE FIXED, BUT if screenshots are provided, preserve the visual design they show. "
-        "Do NOT add HTML comments or attributes that show they were fixes. The code should look like original code."
-    )
+    system_message = _SANDBOX_SYSTEM_MESSAGE
 
-    # Contar errores de contraste detectados
-    contrast_errors = [e for e in detected_errors if 'contraste' in e.lower() or 'contrast' in e.lower()]
+    # Contar errores de contraste detectados (lowercased once; "contraste" contains "contrast").
+    # The list is reused below for the optional automatic contrast fixes.
+    detected_lower = [e.lower() for e in detected_errors]
+    contrast_errors = [e for e, lower in zip(detected_errors, detected_lower) if 'contrast' in lower]
     if contrast_errors:
         print(f"  → {len(contrast_errors)} contrast errors detected - LLM MUST fix ALL")
 
@@ -1574,7 +2646,7 @@ def _process_single_component_sandbox(
         ts_content=ts_content,
         style_content=style_content,
         template_path=str(template_path),
-        ts_path=str(ts_path) if ts_path.exists() else None,
+        ts_path=str(ts_path) if ts_exists else None,
         style_path=str(style_path) if style_path else None,
         detected_errors=detected_errors,
         contrast_errors_count=len(contrast_errors),
@@ -1587,74 +2659,29 @@ def _process_single_component_sandbox(
     
     # If screenshots are available, include them in the user message
     if screenshot_paths:
-        import base64
-        screenshot_instructions = """
-📸 SCREENSHOTS - CRITICAL FOR PRESERVING DESIGN:
-
-I have taken screenshots of the application at different screen sizes (mobile, tablet, desktop) that show how the page REALLY looks before the fixes.
-
-🚨 MANDATORY INSTRUCTIONS ABOUT THE SCREENSHOTS:
-1. EXAMINE each screenshot in detail to understand:
-   - The current visual design (layout, colours, spacing, distribution)
-   - How content adapts at different screen sizes
-   - Which elements are visible/hidden at each size
-   - The application's overall visual style
-
-2. FIX ALL accessibility errors listed above, BUT:
-   - KEEP the visual design you see in the screenshots
-   - Do NOT change background colours, element sizes, or distribution shown in the images
-   - For contrast errors: adjust ONLY the text colour, keeping the background visible in the screenshots
-   - Do NOT add new visible elements (use aria-label or sr-only instead)
-   - Do NOT change display:none to display:block if that element is not visible in the screenshots
-   - Respect the responsive design: if it looks a certain way on mobile, keep it that way
-
-3. YOUR GOAL: Fix ALL accessibility errors WITHOUT changing how the page looks in the screenshots.
-   - Fixes should be visually "invisible"
-   - Use aria-label, roles, alt text, and minimal contrast adjustments
-   - The final design must look IDENTICAL to the screenshots, but accessible
-
-The screenshots show the application BEFORE the fixes. Your job is to make it accessible while keeping that exact visual appearance.
-"""
         user_content = [
-            {"type": "text", "text": user_prompt + screenshot_instructions}
+            {"type": "text", "text": user_prompt + _SCREENSHOT_INSTRUCTIONS}
         ]
         # Add each screenshot as image
         for screenshot_path in screenshot_paths:
             try:
-                screenshot_file = Path(screenshot_path)
-                if screenshot_file.exists():
-                    # Read and encode image as base64
-                    with open(screenshot_file, "rb") as img_file:
-                        image_base64 = base64.b64encode(img_file.read()).decode('utf-8')
-                        # Determine MIME type from extension
-                        mime_type = "image/png"  # Por defecto PNG
-                        if screenshot_path.endswith('.jpg') or screenshot_path.endswith('.jpeg'):
-                            mime_type = "image/jpeg"
-                        user_content.append({
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:{mime_type};base64,{image_base64}"
-                            }
-                        })
+                data_url = _load_screenshot_data_url(screenshot_path)
+                if data_url:
+                    user_content.append({"type": "image_url", "image_url": {"url": data_url}})
             except Exception as e:
                 print(f"  ⚠️ Error al incluir captura {screenshot_path}: {e}")
         messages.append({"role": "user", "content": user_content})
     else:
         messages.append({"role": "user", "content": user_prompt})
 
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=messages,
-        temperature=0.0,
-    )
-
-    response_text = response.choices[0].message.content or ""
+    response_text, pending_cache_path = _cached_chat_completion(client, messages, model="gpt-4o", temperature=0.0)
     log_openai_call(prompt=user_prompt, response=response_text, model="gpt-4o", call_type="angular_component_fix")
 
     print(f"  → LLM responded with {len(response_text)} characters")
     
     # Debug: show first characters of response to see what is being returned
-    print(f"  → Primeros 200 caracteres de respuesta: {response_text[:200]}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("  → Primeros 200 caracteres de respuesta: %s", response_text[:200])
     
     try:
         parsed_response = _parse_component_response(response_text)
@@ -1663,8 +2690,7 @@ The screenshots show the application BEFORE the fixes. Your job is to make it ac
         print(f"  ✗ Error parseando respuesta del LLM: {e}")
         print(f"  → Primeros 500 caracteres de la respuesta: {response_text[:500]}")
         # Intentar extraer template directamente si el parsing falla
-        import re
-        template_match = re.search(r'<<<TEMPLATE>>>\s*(.*?)\s*<<<END TEMPLATE>>>', response_text, re.DOTALL)
+        template_match = _RE_TEMPLATE_BLOCK.search(response_text)
         if template_match:
             parsed_response = {"template": template_match.group(1).strip(), "typescript": None, "styles": None}
             print(f"  → Template extracted using alternative regex")
@@ -1673,13 +2699,17 @@ The screenshots show the application BEFORE the fixes. Your job is to make it ac
             return {
                 "component_name": base_component_name,
                 "template_path": str(template_path),
-                "typescript_path": str(ts_path) if ts_path.exists() else None,
+                "typescript_path": str(ts_path) if ts_exists else None,
                 "styles_path": str(style_path) if style_path else None,
                 "status": "error",
                 "error": f"Error parseando respuesta: {e}",
                 "changes": {}
             }, None
     
+    # Only a reply that parsed into a template is worth replaying on later runs
+    if parsed_response.get("template"):
+        _store_cached_completion(pending_cache_path, response_text)
+    
     # Corregir sintaxis Angular para atributos ARIA con binding
     template_content_corrected = _fix_angular_aria_syntax(parsed_response.get("template"))
     
@@ -1697,7 +2727,7 @@ The screenshots show the application BEFORE the fixes. Your job is to make it ac
         return {
             "component_name": base_component_name,
             "template_path": str(template_path),
-            "typescript_path": str(ts_path) if ts_path.exists() else None,
+            "typescript_path": str(ts_path) if ts_exists else None,
             "styles_path": str(style_path) if style_path else None,
             "status": "error",
             "error": "No se pudo obtener template corregido",
@@ -1709,7 +2739,6 @@ The screenshots show the application BEFORE the fixes. Your job is to make it ac
     # porque pueden elegir un color incorrecto cuando el fondo real es oscuro.
     # Preferimos que el LLM (con el contexto completo) y/o el desarrollador
     # adjust contrast explicitly.
-    contrast_errors = [e for e in detected_errors if 'contraste' in e.lower() or 'contrast' in e.lower()]
     if contrast_errors and ENABLE_AUTOMATIC_CONTRAST_FIXES:
         print(f"  → Applying automatic fixes for {len(contrast_errors)} detected contrast errors")
         template_content_corrected = _apply_automatic_contrast_fixes(template_content_corrected, contrast_errors)
@@ -1717,18 +2746,16 @@ The screenshots show the application BEFORE the fixes. Your job is to make it ac
     print(f"  → Template corregido: {len(template_content_corrected)} caracteres (original: {len(template_content)} caracteres)")
     
     # More robust comparison - normalise spaces but keep structure
-    original_clean = '\n'.join(line.rstrip() for line in template_content.split('\n'))
-    corrected_clean = '\n'.join(line.rstrip() for line in template_content_corrected.split('\n'))
+    original_clean = _RE_TRAIL_WS.sub('', template_content)
+    corrected_clean = _RE_TRAIL_WS.sub('', template_content_corrected)
     
     # Build change map without applying yet (sandbox)
     changes = {}
     
-    # Compare in multiple ways
-    are_different = (
-        original_clean.strip() != corrected_clean.strip() or
-        len(original_clean.strip()) != len(corrected_clean.strip()) or
-        template_content.strip() != template_content_corrected.strip()
-    )
+    # Equal stripped templates imply equal trailing-whitespace-cleaned ones (and
+    # equal lengths), so the raw comparison alone decides; it short-circuits
+    # on length before comparing contents.
+    are_different = template_content.strip() != template_content_corrected.strip()
     
     # If there are automatically detected errors, force changes to be considered
     # even when the comparison does not detect them (LLM may have made subtle changes)
@@ -1740,6 +2767,7 @@ The screenshots show the application BEFORE the fixes. Your job is to make it ac
     # Debug: show specific differences when none are detected
     if not are_different:
         print(f"  ⚠️ Corrected template appears IDENTICAL to original")
+    if not are_different and DEBUG_DIFF:
         print(f"  → Comparing lines...")
         original_lines = template_content.strip().split('\n')
         corrected_lines = template_content_corrected.strip().split('\n')
@@ -1783,8 +2811,9 @@ The screenshots show the application BEFORE the fixes. Your job is to make it ac
         # Show automatically detected errors if any
         if detected_errors:
             print(f"    → {len(detected_errors)} errors were detected automatically, but the LLM did not fix them")
-            for error in detected_errors[:5]:
-                print(f"      - {error[:80]}")
+            if logger.isEnabledFor(logging.DEBUG):
+                for error in detected_errors[:5]:
+                    logger.debug("      - %s", error[:80])
             # Force changes if errors were detected
             print(f"    → FORCING application of changes because errors were detected")
             changes["template"] = {
@@ -1816,7 +2845,7 @@ The screenshots show the application BEFORE the fixes. Your job is to make it ac
     result = {
         "component_name": base_component_name,
         "template_path": str(template_path),
-        "typescript_path": str(ts_path) if ts_path.exists() else None,
+        "typescript_path": str(ts_path) if ts_exists else None,
         "styles_path": str(style_path) if style_path else None,
         "status": status,
         "changes": {
@@ -1831,26 +2860,17 @@ The screenshots show the application BEFORE the fixes. Your job is to make it ac
 
 def _categorize_errors(detected_errors: List[str]) -> Dict[str, List[str]]:
     """Agrupa los errores detectados por tipo"""
-    categories = {
-        "missing_alt": [],
-        "missing_label": [],
-        "missing_aria_label": [],
-        "contrast": [],
-        "other": []
-    }
+    categories: Dict[str, List[str]] = {category: [] for category, _ in _ERROR_CATEGORY_KEYWORDS}
+    categories["other"] = []
     
     for error in detected_errors:
         error_lower = error.lower()
-        if "imagen sin alt" in error_lower or "sin alt" in error_lower or "without alt" in error_lower:
-            categories["missing_alt"].append(error)
-        elif "sin label" in error_lower or "input sin" in error_lower or "without label" in error_lower:
-            categories["missing_label"].append(error)
-        elif "button without" in error_lower or "link without" in error_lower or "aria-label" in error_lower:
-            categories["missing_aria_label"].append(error)
-        elif "contraste" in error_lower or "contrast" in error_lower:
-            categories["contrast"].append(error)
-        else:
-            categories["other"].append(error)
+        category = next(
+            (category for category, needles in _ERROR_CATEGORY_KEYWORDS
+             if any(needle in error_lower for needle in needles)),
+            "other",
+        )
+        categories[category].append(error)
     
     return categories
 
@@ -1860,66 +2880,9 @@ def _build_error_specific_prompt(error_type: str, errors: List[str]) -> str:
     if not errors:
         return ""
     
-    if error_type == "missing_alt":
-        return f"""🔴 IMAGES WITHOUT ALT ERRORS ({len(errors)} found):
-{chr(10).join(f"- {e}" for e in errors)}
-
-ACTION REQUIRED: Add the alt attribute to ALL mentioned images.
-- If the image is informative: alt="Image description"
-- If the image is decorative: alt=""
-- In Angular, use [alt] for dynamic binding or alt="fixed text" for static
-
-FIX ALL images listed above."""
-    
-    elif error_type == "missing_label":
-        return f"""🔴 INPUTS WITHOUT LABEL ERRORS ({len(errors)} found):
-{chr(10).join(f"- {e}" for e in errors)}
-
-ACTION REQUIRED: Add <label> associated with ALL mentioned inputs.
-IMPORTANT ON RESPONSIVE:
-- If the input already has a label with display:none, do NOT change it to display:block
-- Instead, add aria-label to the input: <input id="inputId" aria-label="Description" ... />
-- Or use an sr-only (screen-reader-only) class for the label: <label for="inputId" class="sr-only">Text</label>
-- Only change display if the label does NOT exist and needs to be visible
-
-Correct example (preserving responsive):
-  <label for="inputId" class="sr-only">Label text</label>
-  <input id="inputId" ... />
-  
-Or alternatively:
-  <input id="inputId" aria-label="Label text" ... />
-
-FIX ALL inputs listed above."""
-    
-    elif error_type == "missing_aria_label":
-        return f"""🔴 BUTTONS/LINKS WITHOUT ARIA-LABEL ERRORS ({len(errors)} found):
-{chr(10).join(f"- {e}" for e in errors)}
-
-ACTION REQUIRED: Add descriptive aria-label to ALL mentioned buttons/links.
-- For static values: aria-label="Description"
-- For dynamic binding in Angular: [attr.aria-label]="variable"
-
-FIX ALL elements listed above."""
-    
-    elif error_type == "contrast":
-        return f"""🔴 CONTRAST ERRORS ({len(errors)} found):
-{chr(10).join(f"- {e}" for e in errors)}
-
-ACTION REQUIRED: Fix colour contrast for ALL mentioned elements.
-- Minimum ratio required: 4.5:1 for normal text, 3:1 for large text
-- On light backgrounds: use style="color: #000000" or #212121
-- On dark backgrounds: use style="color: #FFFFFF" or #F5F5F5
-- Find ALL similar elements and fix them too
-
-FIX ALL low-contrast elements listed above."""
-    
-    else:
-        return f"""🔴 OTHER ERRORS ({len(errors)} found):
-{chr(10).join(f"- {e}" for e in errors)}
-
-ACTION REQUIRED: Fix these accessibility errors."""
-    
-    return ""
+    heading, instructions = _ERROR_PROMPT_SECTIONS.get(error_type, _ERROR_PROMPT_SECTIONS["other"])
+    error_list = "\n".join(f"- {e}" for e in errors)
+    return f"{heading} ({len(errors)} found):\n{error_list}\n\n{instructions}"
 
 
 def _format_detected_errors(detected_errors: List[str]) -> str:
@@ -1937,69 +2900,8 @@ def _format_detected_errors(detected_errors: List[str]) -> str:
     
     # Add Axe errors first (they are more specific)
     if axe_errors:
-        error_list = "\n".join([f"\n{i+1}. {e}" for i, e in enumerate(axe_errors)])
-        prompts.append(f"""🔴 AXE ERRORS DETECTED ({len(axe_errors)} found):
-These are REAL errors detected by the Axe accessibility tool on the rendered application. You MUST fix ALL of them without exception.
-
-{error_list}
-
-ACTION REQUIRED FOR EACH ERROR:
-1. Locate the element in the template using:
-   - The CSS selector provided (e.g. "button[type=\"submit\"] > .mdc-button__label")
-     * Axe selectors may have specific CSS classes - look for them in the template
-     * If the selector has ">" (direct child), look for the parent > child structure in the template
-     * If the selector has classes like ".mdc-button__label", look for elements with class="..." that contain that class
-   - Or the HTML fragment shown (it may have Angular dynamic attributes that you should ignore)
-     * Ignore Angular dynamic attributes like _ngcontent-* and _nghost-*
-     * Search by text content, static attributes, and structure
-   - IMPORTANT: If you don't find the exact selector, look for variations:
-     * Search by contained text (e.g. "Login", "Save", etc.)
-     * Search by similar CSS classes
-     * Search by similar HTML structure
-
-2. Fix the specific error:
-   - If it's "color-contrast":
-     * CRITICAL: These are REAL errors detected on the rendered application. You MUST fix ALL of them.
-     * The contrast data shows the REAL colour in the rendered HTML (after CSS is applied)
-     * If the template already has style="color: ..." but Axe detects a different colour, the CSS is overriding it
-     * MANDATORY FIX: Add !important to the inline style so it overrides the CSS: style="color: #000000 !important;"
-     * Correction rules:
-       - If current ratio < 4.5 (normal text) or < 3.0 (large text), contrast is INSUFFICIENT and MUST be fixed
-       - On LIGHT backgrounds (white, light grey, etc.): use DARK text (color="#000000" or color="#212121")
-       - On DARK backgrounds (black, dark grey, dark colours): use LIGHT text (color="#FFFFFF" or color="#F5F5F5")
-       - Example: If Axe detects ratio 3.33 (insufficient), background is #ff4081 (pink), text is #ffffff (white),
-         change text to dark colour: style="color: #000000 !important;" or change background to a lighter one
-       - ALWAYS add !important to ensure the style applies over existing CSS
-     * LOCATION: Find the element using the CSS selector provided (e.g. "button[type=\"submit\"] > .mdc-button__label")
-       or find the HTML fragment shown in the template
-       * ⚠️ CRITICAL - Elements generated by Angular Material:
-         If the selector points to ".mdc-button__label", ".mat-button-label", or any element with " > " pointing to an internal span/div,
-         that element does NOT exist in your template - Angular Material generates it automatically in the rendered DOM.
-         
-         SPECIFIC EXAMPLE:
-         - Axe error: Selector ".mat-warn > .mdc-button__label", HTML "<span class="mdc-button__label">Get Started</span>"
-         - In your template you will find: <button mat-button color="warn">Get Started</button>
-         - FIX: Add the style to the PARENT BUTTON:
-           <button mat-button color="warn" style="color: #000000 !important;">Get Started</button>
-         - The style with !important will apply to the text inside the button, including the internal span generated by Angular Material
-         
-         GENERAL RULE:
-         - If the selector has " > .mdc-button__label" or " > .mat-button-label", find the parent button in the template
-         - Extract the parent selector (the part before " > ")
-         - Find that button in the template (it may have color="warn", class="mat-warn", or the button text)
-         - Apply style="color: [correct-color] !important;" directly to the button
-         - If ratio is insufficient and background is light (#fafafa, white, etc.), use dark colour (#000000)
-         - If ratio is insufficient and background is dark, use light colour (#FFFFFF)
-   - If it's "link-name" or "button-name": Add descriptive aria-label to the link/button
-   - If it's another error: Follow the description and help provided
-
-3. For contrast errors:
-   - The data shows the REAL colour detected by Axe in the rendered HTML
-   - If the template has a different colour, the CSS is overriding it
-   - You MUST use !important in the inline style to ensure it applies: style="color: #000000 !important;"
-   - Do NOT return the code without fixing these errors - they are REAL errors that exist in the application
-
-⚠️ CRITICAL: These errors EXIST in the rendered application. Do NOT return the same code. You MUST make visible changes.""")
+        error_list = "\n".join(f"\n{i}. {e}" for i, e in enumerate(axe_errors, 1))
+        prompts.append(_AXE_PROMPT_HEADER.format(count=len(axe_errors)) + error_list + _AXE_PROMPT_FOOTER)
     
     # Add categorised static errors
     for error_type, errors in categories.items():
@@ -2022,16 +2924,33 @@ ACTION REQUIRED FOR EACH ERROR:
 def _analyze_template_for_accessibility_errors(template_content: str, style_content: Optional[str] = None) -> List[str]:
     """Analyse the template and CSS for obvious accessibility errors using raw text analysis"""
     errors = []
-    import re
     
     try:
         # Raw-text analysis to handle Angular better
         lines = template_content.split('\n')
         
-        # Look for buttons without text or aria-label (search in raw HTML)
-        button_pattern = r'<button[^>]*>'
+        # Single pass over the lines; each check keeps its own bucket so the
+        # reported order (buttons, links, inputs, images, contrast) is unchanged.
+        button_errors = []
+        link_errors = []
+        input_errors = []
+        img_errors = []
+        text_errors = []
+        input_ids = []
+        label_fors = set()
+        # Lines carrying an aria-label, for the unlabelled-input check below
+        aria_label_lines = []
+        
         for i, line in enumerate(lines, 1):
-            if re.search(button_pattern, line, re.IGNORECASE):
+            if 'aria-label=' in line or '[attr.aria-label]' in line:
+                aria_label_lines.append(line)
+            
+            # Every check below starts with one of these tag openers
+            if not _A11Y_TAG_HINT_RE.search(line):
+                continue
+            
+            # Look for buttons without text or aria-label (search in raw HTML)
+            if _BUTTON_OPEN_RE.search(line):
                 # Check if it has aria-label (static or binding)
                 has_aria_label = (
                     'aria-label=' in line or 
@@ -2039,44 +2958,36 @@ def _analyze_template_for_accessibility_errors(template_content: str, style_cont
                     'aria-labelledby=' in line
                 )
                 # Extract button content (text between > and <)
-                button_match = re.search(r'<button[^>]*>(.*?)</button>', line, re.DOTALL | re.IGNORECASE)
+                button_match = _BUTTON_FULL_RE.search(line)
                 if button_match:
                     button_content = button_match.group(1)
                     # Limpiar contenido Angular y HTML
-                    button_text = re.sub(r'\{[^}]*\}|<[^>]+>|\*ng[A-Za-z]*="[^"]*"', '', button_content).strip()
+                    button_text = _CLEAN_NG_RE.sub('', button_content).strip()
                     # Si no tiene texto visible ni aria-label, es un error
                     if not button_text and not has_aria_label:
-                        errors.append(f"Line {i}: Button without visible text or aria-label")
+                        button_errors.append(f"Line {i}: Button without visible text or aria-label")
                 elif not has_aria_label:
                     # Button may span multiple lines
-                    errors.append(f"Line {i}: Button possibly without aria-label (verify manually)")
-        
-        # Buscar enlaces sin texto descriptivo
-        link_pattern = r'<a[^>]*>'
-        for i, line in enumerate(lines, 1):
-            if re.search(link_pattern, line, re.IGNORECASE):
+                    button_errors.append(f"Line {i}: Button possibly without aria-label (verify manually)")
+            
+            # Buscar enlaces sin texto descriptivo
+            if _LINK_OPEN_RE.search(line):
                 has_aria_label = (
                     'aria-label=' in line or 
                     '[attr.aria-label]' in line
                 )
-                link_match = re.search(r'<a[^>]*>(.*?)</a>', line, re.DOTALL | re.IGNORECASE)
+                link_match = _LINK_FULL_RE.search(line)
                 if link_match:
-                    link_text = re.sub(r'\{[^}]*\}|<[^>]+>', '', link_match.group(1)).strip()
+                    link_text = _CLEAN_TEXT_RE.sub('', link_match.group(1)).strip()
                     if not link_text and not has_aria_label:
-                        errors.append(f"Line {i}: Link without text or aria-label")
-                    elif link_text.lower().strip() in ['click aquí', 'más', 'aquí', 'click here', 'more', 'here', 'more info', 'ver más', 'read more']:
-                        errors.append(f"Line {i}: Link with generic text '{link_text}' needs descriptive aria-label")
-        
-        # Buscar inputs sin label (buscar por id y for)
-        input_pattern = r'<(input|select|textarea)[^>]*>'
-        input_ids = []
-        label_fors = []
-        
-        for i, line in enumerate(lines, 1):
-            # Buscar inputs y sus IDs
-            input_match = re.search(input_pattern, line, re.IGNORECASE)
+                        link_errors.append(f"Line {i}: Link without text or aria-label")
+                    elif link_text.lower().strip() in _GENERIC_LINK_TEXTS:
+                        link_errors.append(f"Line {i}: Link with generic text '{link_text}' needs descriptive aria-label")
+            
+            # Buscar inputs sin label (buscar por id y for)
+            input_match = _INPUT_OPEN_RE.search(line)
             if input_match:
-                id_match = re.search(r'\bid=["\']([^"\']+)["\']', line)
+                id_match = _INPUT_ID_RE.search(line)
                 if id_match:
                     input_ids.append(id_match.group(1))
                 else:
@@ -2087,43 +2998,27 @@ def _analyze_template_for_accessibility_errors(template_content: str, style_cont
                         'aria-labelledby=' in line
                     )
                     if not has_aria_label:
-                        errors.append(f"Line {i}: Input without id or aria-label (needs associated label)")
+                        input_errors.append(f"Line {i}: Input without id or aria-label (needs associated label)")
             
             # Buscar labels y sus atributos for
-            label_match = re.search(r'<label[^>]*>', line, re.IGNORECASE)
+            label_match = _LABEL_OPEN_RE.search(line)
             if label_match:
-                for_match = re.search(r'\bfor=["\']([^"\']+)["\']', line)
+                for_match = _LABEL_FOR_RE.search(line)
                 if for_match:
-                    label_fors.append(for_match.group(1))
-        
-        # Verificar inputs sin label asociado
-        for inp_id in input_ids:
-            if inp_id not in label_fors:
-                # Check if the input has aria-label on a nearby line
-                found_aria = False
-                for line in lines:
-                    if inp_id in line and ('aria-label=' in line or '[attr.aria-label]' in line):
-                        found_aria = True
-                        break
-                if not found_aria:
-                    errors.append(f"Input con id='{inp_id}' sin label asociado (usar <label for=\"{inp_id}\">)")
-        
-        # Look for images without alt
-        img_pattern = r'<img[^>]*>'
-        for i, line in enumerate(lines, 1):
-            if re.search(img_pattern, line, re.IGNORECASE):
+                    label_fors.add(for_match.group(1))
+            
+            # Look for images without alt
+            if _IMG_OPEN_RE.search(line):
                 if 'alt=' not in line:
-                    errors.append(f"Line {i}: Image without alt attribute")
-        
-        # Look for elements with text that may have contrast issues
-        # Look for <p>, <a>, <span>, <div>, <h1-h6> without explicit colour
-        text_elements_pattern = r'<(p|a|span|div|h[1-6]|label|button)[^>]*>'
-        for i, line in enumerate(lines, 1):
-            if re.search(text_elements_pattern, line, re.IGNORECASE):
+                    img_errors.append(f"Line {i}: Image without alt attribute")
+            
+            # Look for elements with text that may have contrast issues
+            # Look for <p>, <a>, <span>, <div>, <h1-h6> without explicit colour
+            if _TEXT_ELEM_OPEN_RE.search(line):
                 # Verificar si tiene texto visible
-                element_match = re.search(r'<(p|a|span|div|h[1-6]|label|button)[^>]*>(.*?)</\1>', line, re.DOTALL | re.IGNORECASE)
+                element_match = _TEXT_ELEM_FULL_RE.search(line)
                 if element_match:
-                    element_text = re.sub(r'\{[^}]*\}|<[^>]+>', '', element_match.group(2)).strip()
+                    element_text = _CLEAN_TEXT_RE.sub('', element_match.group(2)).strip()
                     if element_text and len(element_text) > 10:  # Solo si tiene texto significativo
                         # Check if it has explicit colour
                         has_explicit_color = (
@@ -2134,7 +3029,22 @@ def _analyze_template_for_accessibility_errors(template_content: str, style_cont
                         # Check if it has classes that may cause issues
                         has_problematic_class = any(cls in line for cls in ['text-muted', 'text-secondary', 'text-light', 'text-gray', 'btn'])
                         if not has_explicit_color and (has_problematic_class or 'class=' in line):
-                            errors.append(f"Line {i}: Possible contrast error - {element_match.group(1)} with text without explicit colour (add style='color: #000000')")
+                            text_errors.append(f"Line {i}: Possible contrast error - {element_match.group(1)} with text without explicit colour (add style='color: #000000')")
+        
+        errors.extend(button_errors)
+        errors.extend(link_errors)
+        errors.extend(input_errors)
+        
+        # Verificar inputs sin label asociado
+        for inp_id in input_ids:
+            if inp_id not in label_fors:
+                # Check if the input has aria-label on a nearby line
+                found_aria = any(inp_id in line for line in aria_label_lines)
+                if not found_aria:
+                    errors.append(f"Input con id='{inp_id}' sin label asociado (usar <label for=\"{inp_id}\">)")
+        
+        errors.extend(img_errors)
+        errors.extend(text_errors)
         
         # Analizar CSS para detectar posibles problemas de contraste
         if style_content:
@@ -2143,16 +3053,48 @@ def _analyze_template_for_accessibility_errors(template_content: str, style_cont
         
     except Exception as e:
         print(f"  ⚠️ Error analizando template: {e}")
-        import traceback
         traceback.print_exc()
     
     return errors
 
 
+def _css_color_to_rgb(color_value: str) -> Optional[Tuple[float, float, float]]:
+    """Parse a #hex or rgb()/rgba() colour, compositing any alpha over white."""
+    if color_value.startswith('#'):
+        digits = color_value[1:]
+        if len(digits) in (3, 4):
+            digits = ''.join(c * 2 for c in digits)
+        if len(digits) not in (6, 8):
+            return None
+        channels = [int(digits[k:k + 2], 16) for k in range(0, len(digits), 2)]
+        alpha = channels[3] / 255 if len(channels) == 4 else 1.0
+    else:
+        parts = _CSS_RGB_ARGS_RE.findall(color_value)
+        if len(parts) < 3:
+            return None
+        channels = [float(v) * 2.55 if pct else float(v) for v, pct in parts[:3]]
+        if len(parts) > 3:
+            value, pct = parts[3]
+            alpha = float(value) / 100 if pct else float(value)
+        else:
+            alpha = 1.0
+    alpha = min(max(alpha, 0.0), 1.0)
+    r, g, b = (alpha * min(c, 255) + (1 - alpha) * 255 for c in channels[:3])
+    return r, g, b
+
+
+def _is_light_css_color(color_value: str) -> bool:
+    """True when the colour's perceived luminance is above CSS_LIGHT_COLOR_LUMINANCE."""
+    rgb = _css_color_to_rgb(color_value)
+    if rgb is None:
+        return False
+    r, g, b = rgb
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b > CSS_LIGHT_COLOR_LUMINANCE
+
+
 def _analyze_css_for_contrast_issues(style_content: str, template_lines: List[str]) -> List[str]:
     """Analiza el CSS para detectar posibles problemas de contraste"""
     errors = []
-    import re
     
     try:
         # Buscar clases comunes que suelen tener problemas de contraste
@@ -2162,28 +3104,31 @@ def _analyze_css_for_contrast_issues(style_content: str, template_lines: List[st
                 if problematic_class in template_line:
                     errors.append(f"Line {j}: Possible contrast error - class '{problematic_class}' detected (add style='color: #000000')")
         
-        # Buscar colores claros en el CSS
-        css_lines = style_content.split('\n')
-        for i, css_line in enumerate(css_lines, 1):
-            # Buscar reglas de color que puedan tener bajo contraste
-            if re.search(r'color\s*:', css_line, re.IGNORECASE):
-                # Check if it's a light colour (simple heuristic)
-                color_match = re.search(r'color\s*:\s*(#[a-f0-9]{3,6}|rgba?\([^)]+\))', css_line, re.IGNORECASE)
-                if color_match:
-                    color_value = color_match.group(1).lower()
-                    # Detectar colores claros
-                    if (color_value.startswith('#f') or color_value.startswith('#e') or 
-                        color_value.startswith('#d') or 
-                        ('rgba' in color_value and any(x in color_value for x in ['0.8', '0.7', '0.6', '0.5']))):
-                        # Buscar el selector asociado
-                        selector_match = re.search(r'^[^{]+', css_line)
-                        if selector_match:
-                            selector = selector_match.group(0).strip()
-                            # Buscar si este selector se usa en el template
-                            for j, template_line in enumerate(template_lines, 1):
-                                if selector.replace('.', '').replace('#', '') in template_line:
-                                    errors.append(f"Line {j}: Possible contrast error - light colour '{color_value}' detected in CSS")
-                                    break
+        # Selectors are resolved to the first template line containing them with
+        # one str.find over the joined template instead of a per-line loop.
+        template_text = '\n'.join(template_lines)
+        line_starts = [0]
+        for template_line in template_lines[:-1]:
+            line_starts.append(line_starts[-1] + len(template_line) + 1)
+        selector_lines: Dict[str, Optional[int]] = {}
+        
+        # Buscar colores claros en el CSS: one pass over the stylesheet, one
+        # match per rule with its selector and text colour
+        for rule_match in _CSS_COLOR_RULE_RE.finditer(style_content):
+            color_value = rule_match.group(2).lower()
+            if not _is_light_css_color(color_value):
+                continue
+            for selector in rule_match.group(1).split(','):
+                # Buscar si este selector se usa en el template
+                selector_key = selector.strip().replace('.', '').replace('#', '')
+                if not selector_key:
+                    continue
+                if selector_key not in selector_lines:
+                    pos = template_text.find(selector_key) if template_lines else -1
+                    selector_lines[selector_key] = bisect_right(line_starts, pos) if pos != -1 else None
+                j = selector_lines[selector_key]
+                if j is not None:
+                    errors.append(f"Line {j}: Possible contrast error - light colour '{color_value}' detected in CSS")
         
     except Exception as e:
         # No fallar si hay error analizando CSS
@@ -2312,12 +3257,12 @@ def _parse_component_response(response_text: str) -> Dict[str, Optional[str]]:
     return sections
 
 
+@lru_cache(maxsize=256)
 def _clean_code_from_markdown(code: str) -> str:
     """
     Strip any markdown the LLM may have included from the code.
     Removes markdown code blocks (```ts, ```typescript, ```css, etc.)
     """
-    import re
     
     # Remove markdown code blocks at the start
     # Pattern: ```ts, ```typescript, ```css, ```scss, ```html, etc.
@@ -2333,6 +3278,7 @@ def _clean_code_from_markdown(code: str) -> str:
     return code.strip()
 
 
+@lru_cache(maxsize=256)
 def _extract_between_markers(text: str, start_marker: str, end_marker: str) -> Optional[str]:
     start_idx = text.find(start_marker)
     end_idx = text.find(end_marker)
@@ -2343,7 +3289,6 @@ def _extract_between_markers(text: str, start_marker: str, end_marker: str) -> O
 
 def _apply_automatic_contrast_fixes(template_content: str, contrast_errors: List[str]) -> str:
     """Apply automatic contrast fixes to detected elements"""
-    import re
     
     lines = template_content.split('\n')
     corrected_lines = []
@@ -2397,83 +3342,100 @@ def _fix_responsive_breaking_changes(original: str, corrected: str) -> str:
     if not original or not corrected:
         return corrected
     
-    import re
     
     # Buscar en el original labels con display:none (en style o como atributo)
-    original_display_none_labels = re.findall(
-        r'<label[^>]*(?:style="[^"]*display\s*:\s*none[^"]*"|class="[^"]*visually-hidden[^"]*")[^>]*>.*?</label>',
-        original,
-        re.DOTALL | re.IGNORECASE
-    )
+    original_display_none_labels = _HIDDEN_STYLE_LABEL_RE.findall(original)
     
     # Also look for labels with hidden attribute
-    original_hidden_labels = re.findall(
-        r'<label[^>]*hidden[^>]*>.*?</label>',
-        original,
-        re.DOTALL | re.IGNORECASE
-    )
+    original_hidden_labels = _HIDDEN_ATTR_LABEL_RE.findall(original)
     
     all_original_labels = original_display_none_labels + original_hidden_labels
     
     if not all_original_labels:
         return corrected
     
+    # Index the corrected labels once by their for= value (first label wins,
+    # matching is case-insensitive like the original lookups)
+    corrected_labels_by_for: Dict[str, str] = {}
+    for corrected_match in _LABEL_WITH_FOR_RE.finditer(corrected):
+        corrected_labels_by_for.setdefault(corrected_match.group(1).lower(), corrected_match.group(0))
+    
     # For each hidden label in the original, check if it was changed in the corrected one
     for original_label in all_original_labels:
         # Extraer el contenido del label (texto entre > y <)
-        label_match = re.search(r'<label[^>]*>(.*?)</label>', original_label, re.DOTALL)
+        label_match = _LABEL_CONTENT_RE.search(original_label)
         if not label_match:
             continue
         
         label_content = label_match.group(1).strip()
         # Buscar el for attribute
-        for_attr_match = re.search(r'for="([^"]+)"', original_label)
+        for_attr_match = _FOR_DQ_RE.search(original_label)
         if not for_attr_match:
             continue
         
         for_value = for_attr_match.group(1)
         
-        # Check in the corrected version if that label was changed to display:block
-        pattern_block = rf'<label[^>]*for="{re.escape(for_value)}"[^>]*style="[^"]*display\s*:\s*block[^"]*"[^>]*>'
-        # Also check if hidden or display:none was removed
-        pattern_no_hidden = rf'<label[^>]*for="{re.escape(for_value)}"[^>]*(?!style="[^"]*display\s*:\s*none)(?!class="[^"]*visually-hidden)(?!hidden)[^>]*>'
+        for_key = for_value.lower()
+        corrected_label_full = corrected_labels_by_for.get(for_key)
+        if corrected_label_full is None:
+            continue
         
-        needs_fix = False
-        if re.search(pattern_block, corrected, re.IGNORECASE):
+        corrected_label_lower = corrected_label_full.lower()
+        # Check in the corrected version if that label was changed to display:block
+        if _STYLE_DISPLAY_BLOCK_RE.search(corrected_label_full[:corrected_label_full.find('>') + 1]):
             needs_fix = True
-        elif re.search(pattern_no_hidden, corrected, re.IGNORECASE):
+        else:
             # Verificar que no tenga display:none ni visually-hidden en el corregido
-            corrected_label_match = re.search(
-                rf'<label[^>]*for="{re.escape(for_value)}"[^>]*>.*?</label>',
-                corrected,
-                re.DOTALL | re.IGNORECASE
-            )
-            if corrected_label_match:
-                corrected_label_full = corrected_label_match.group(0)
-                if 'display:none' not in corrected_label_full.lower() and 'visually-hidden' not in corrected_label_full.lower() and 'hidden' not in corrected_label_full.lower():
-                    needs_fix = True
+            needs_fix = 'display:none' not in corrected_label_lower and 'hidden' not in corrected_label_lower
         
         if needs_fix:
             # LLM changed display:none/hidden to visible - revert it
-            corrected_label_match = re.search(
-                rf'<label[^>]*for="{re.escape(for_value)}"[^>]*>.*?</label>',
-                corrected,
-                re.DOTALL | re.IGNORECASE
-            )
-            if corrected_label_match:
-                corrected_label_full = corrected_label_match.group(0)
-                # Extraer el atributo for y el contenido
-                label_id_match = re.search(r'for="([^"]+)"', corrected_label_full)
-                label_content_match = re.search(r'<label[^>]*>(.*?)</label>', corrected_label_full, re.DOTALL)
-                
-                if label_id_match and label_content_match:
-                    new_label = f'<label for="{label_id_match.group(1)}" class="visually-hidden">{label_content_match.group(1).strip()}</label>'
-                    corrected = corrected.replace(corrected_label_full, new_label)
-                    print(f"  ⚠️ Detectado cambio que rompe responsive: label con display:block revertido a visually-hidden")
+            # Extraer el atributo for y el contenido
+            label_id_match = _FOR_DQ_RE.search(corrected_label_full)
+            label_content_match = _LABEL_CONTENT_RE.search(corrected_label_full)
+            
+            if label_id_match and label_content_match:
+                new_label = f'<label for="{label_id_match.group(1)}" class="visually-hidden">{label_content_match.group(1).strip()}</label>'
+                corrected = corrected.replace(corrected_label_full, new_label)
+                corrected_labels_by_for[for_key] = new_label
+                print(f"  ⚠️ Detectado cambio que rompe responsive: label con display:block revertido a visually-hidden")
     
     return corrected
 
 
+# Icons with a static (or, for <nb-icon>, bound) aria-label, and role="progressbar" tags.
+_ICON_OR_PROGRESSBAR_RE = re.compile(
+    r'(<(?:i\s+[^>]*aria-label|nb-icon\s+[^>]*(?:aria-label|\[attr\.aria-label\]))="[^"]*"[^>]*>)'
+    r'|<[^>]*\s+role="progressbar"[^>]*>'
+)
+_PROGRESSBAR_ROLE_RE = re.compile(r'\s+role="progressbar"')
+_ARIA_VALUENOW_RE = re.compile(r'aria-valuenow="([^"]*)"')
+
+
+def _fix_icon_or_progressbar_tag(match: "re.Match") -> str:
+    """Add role="img" to an unlabelled-role icon, or an aria-label to a progressbar."""
+    tag = match.group(0)
+    if match.group(1) and 'role=' not in tag:
+        return tag[:-1] + ' role="img">'
+    if _PROGRESSBAR_ROLE_RE.search(tag) and 'aria-label=' not in tag and 'aria-labelledby=' not in tag:
+        # Crear un label descriptivo
+        valuenow_match = _ARIA_VALUENOW_RE.search(tag)
+        valuenow = valuenow_match.group(1) if valuenow_match else ""
+        label_text = f"Progress: {valuenow}%" if valuenow else "Progress indicator"
+        return tag[:-1] + f' aria-label="{label_text}">'
+    return tag
+
+
+_HTML_OPEN_TAG_RE = re.compile(r'(<html)([^>]*>)')
+
+
+def _ensure_html_lang(match: "re.Match") -> str:
+    """Add lang="en" to the <html> tag unless it already declares a language."""
+    if 'lang=' in match.group(2):
+        return match.group(0)
+    return f'{match.group(1)} lang="en"{match.group(2)}'
+
+
 def _apply_automatic_accessibility_fixes(template_content: Optional[str]) -> Optional[str]:
     """
     Apply common automatic accessibility fixes that the LLM may not do consistently.
@@ -2486,69 +3448,14 @@ def _apply_automatic_accessibility_fixes(template_content: Optional[str]) -> Opt
     if not template_content:
         return template_content
     
-    import re
     corrected = template_content
     
-    # 1. Add role="img" to <i> with aria-label but no role
-    # Pattern: <i ... aria-label="..." ...> (no role)
-    pattern_i_with_aria = r'(<i\s+[^>]*aria-label="[^"]*"[^>]*?)(?<!role="[^"]*")(?<!role=\'[^\']*\')([^>]*>)'
-    def add_role_to_i(match):
-        full_tag = match.group(0)
-        # Si ya tiene role, no hacer nada
-        if 'role=' in full_tag:
-            return full_tag
-        # Add role="img" before closing >
-        return full_tag[:-1] + ' role="img">'
-    
-    # Buscar <i> con aria-label sin role
-    i_tags = re.finditer(r'<i\s+[^>]*aria-label="[^"]*"[^>]*>', corrected)
-    for match in list(i_tags):
-        tag = match.group(0)
-        if 'role=' not in tag:
-            corrected = corrected.replace(tag, tag[:-1] + ' role="img">', 1)
-    
-    # 2. Add role="img" to <nb-icon> with aria-label but no role
-    # Buscar <nb-icon ... aria-label="..." ...> (sin role)
-    nb_icon_tags = re.finditer(r'<nb-icon\s+[^>]*aria-label="[^"]*"[^>]*>', corrected)
-    for match in list(nb_icon_tags):
-        tag = match.group(0)
-        if 'role=' not in tag:
-            corrected = corrected.replace(tag, tag[:-1] + ' role="img">', 1)
-    
-    # Also handle [attr.aria-label] (dynamic binding)
-    nb_icon_tags_dynamic = re.finditer(r'<nb-icon\s+[^>]*\[attr\.aria-label\]="[^"]*"[^>]*>', corrected)
-    for match in list(nb_icon_tags_dynamic):
-        tag = match.group(0)
-        if 'role=' not in tag:
-            corrected = corrected.replace(tag, tag[:-1] + ' role="img">', 1)
-    
-    # 3. Add lang attribute to <html> if missing
-    if '<html' in corrected and 'lang=' not in corrected.split('<html')[1].split('>')[0]:
-        corrected = re.sub(r'(<html)([^>]*>)', r'\1 lang="en"\2', corrected, count=1)
-    
-    # 4. Add aria-label to elements with role="progressbar" that don't have it
-    progressbar_pattern = r'(<[^>]*\s+role="progressbar"[^>]*?)(?<!aria-label="[^"]*")(?<!aria-labelledby="[^"]*")([^>]*>)'
-    def add_aria_to_progressbar(match):
-        full_tag = match.group(0)
-        # Si ya tiene aria-label o aria-labelledby, no hacer nada
-        if 'aria-label=' in full_tag or 'aria-labelledby=' in full_tag:
-            return full_tag
-        # Extraer el valor de aria-valuenow si existe para crear un label descriptivo
-        valuenow_match = re.search(r'aria-valuenow="([^"]*)"', full_tag)
-        valuenow = valuenow_match.group(1) if valuenow_match else ""
-        label_text = f"Progress: {valuenow}%" if valuenow else "Progress indicator"
-        # Add aria-label before closing >
-        return full_tag[:-1] + f' aria-label="{label_text}">'
-    
-    progressbar_tags = re.finditer(r'<[^>]*\s+role="progressbar"[^>]*>', corrected)
-    for match in list(progressbar_tags):
-        tag = match.group(0)
-        if 'aria-label=' not in tag and 'aria-labelledby=' not in tag:
-            # Crear un label descriptivo
-            valuenow_match = re.search(r'aria-valuenow="([^"]*)"', tag)
-            valuenow = valuenow_match.group(1) if valuenow_match else ""
-            label_text = f"Progress: {valuenow}%" if valuenow else "Progress indicator"
-            corrected = corrected.replace(tag, tag[:-1] + f' aria-label="{label_text}">', 1)
+    # 1 and 3. Add role="img" to labelled <i>/<nb-icon> without a role, and an
+    # aria-label to role="progressbar" elements without one, in a single pass
+    corrected = _ICON_OR_PROGRESSBAR_RE.sub(_fix_icon_or_progressbar_tag, corrected)
+    
+    # 2. Add lang attribute to <html> if missing
+    corrected = _HTML_OPEN_TAG_RE.sub(_ensure_html_lang, corrected, count=1)
     
     return corrected
 
@@ -2561,7 +3468,6 @@ def _fix_basic_syntax_errors(template_content: Optional[str]) -> Optional[str]:
     if not template_content:
         return template_content
     
-    import re
     
     corrected = template_content
     
@@ -2657,7 +3563,6 @@ def _fix_angular_aria_syntax(template_content: Optional[str]) -> Optional[str]:
     if not template_content:
         return template_content
     
-    import re
     
     # Pattern to find aria-* with interpolation binding {{ }}
     # Ejemplo: aria-pressed="{{condicion}}" -> [attr.aria-pressed]="condicion"
@@ -2699,7 +3604,7 @@ def _apply_changes_map(changes_map: List[Dict], project_root: Path) -> int:
         for file_type, file_change in changes.items():
             try:
                 target_path = Path(file_change["path"])
-                target_path.write_text(file_change["corrected"], encoding="utf-8")
+                _write_source_text(target_path, file_change["corrected"])
                 applied_count += 1
             except Exception as e:
                 print(f"  ⚠️ Error aplicando cambio en {file_change['path']}: {e}")
@@ -2713,7 +3618,7 @@ def _revert_changes(changes_map: List[Dict], project_root: Path) -> None:
         for file_type, file_change in changes.items():
             try:
                 target_path = Path(file_change["path"])
-                target_path.write_text(file_change["original"], encoding="utf-8")
+                _write_source_text(target_path, file_change["original"])
             except Exception as e:
                 print(f"  ⚠️ Error revirtiendo cambio en {file_change['path']}: {e}")
 
@@ -2873,21 +3778,15 @@ def _compile_and_get_errors(project_root: Path) -> Dict:
                     package_data = json.load(f)
                     scripts = package_data.get("scripts", {})
                     if "build" in scripts:
-                        result = subprocess.run(
-                            ["npm", "run", "build"],
-                            cwd=str(project_root),
-                            capture_output=True,
-                            text=True,
-                            timeout=300
+                        returncode, output, errors = _run_build_and_parse_errors(
+                            ["npm", "run", "build"], project_root
                         )
-                        output = result.stderr + result.stdout
                         verification_available = True
                         # Parsear errores incluso si returncode == 0 (puede haber errores de TypeScript)
-                        errors = _parse_angular_errors(output)
                         if errors:
                             success = False
                             print(f"  → Build completed but {len(errors)} errors found, parsing...")
-                        elif result.returncode != 0:
+                        elif returncode != 0:
                             success = False
                             print(f"  → Build failed, parsing errors...")
             except Exception as e:
@@ -2903,24 +3802,15 @@ def _compile_and_get_errors(project_root: Path) -> Dict:
                     build_cmd.append(default_project)
                     print(f"  → Workspace multi-proyecto detectado, compilando proyecto: {default_project}")
                 
-                result = subprocess.run(
-                    build_cmd,
-                    cwd=str(project_root),
-                    capture_output=True,
-                    text=True,
-                    encoding='utf-8',
-                    errors='replace',
-                    timeout=300
-                )
-                output = result.stderr + result.stdout
+                returncode, output, build_errors = _run_build_and_parse_errors(build_cmd, project_root)
                 verification_available = True
                 # Parsear errores incluso si returncode == 0 (puede haber errores de TypeScript)
                 if not errors:  # Solo parsear si no se obtuvieron errores antes
-                    errors = _parse_angular_errors(output)
+                    errors = build_errors
                     if errors:
                         success = False
                         print(f"  → Build completed but {len(errors)} errors found, parsing...")
-                    elif result.returncode != 0:
+                    elif returncode != 0:
                         success = False
                         print(f"  → Build failed, parsing errors...")
             except Exception as e:
@@ -2941,16 +3831,78 @@ def _compile_and_get_errors(project_root: Path) -> Dict:
     }
 
 
+def _run_build_and_parse_errors(
+    cmd: List[str], project_root: Path, timeout: int = 300
+) -> Tuple[int, str, List[str]]:
+    """
+    Run a build command, parsing errors from its output while it streams in.
+
+    stderr is merged into stdout and the pipe is drained line by line, so a
+    chatty failing build can never block on a full OS pipe buffer.
+
+    Returns:
+        (returncode, full output, parsed errors)
+
+    Raises:
+        subprocess.TimeoutExpired: if the build runs longer than ``timeout``.
+    """
+    process = subprocess.Popen(
+        cmd,
+        cwd=str(project_root),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding='utf-8',
+        errors='replace',
+        bufsize=1,
+    )
+    timed_out = threading.Event()
+
+    def _kill_on_timeout() -> None:
+        timed_out.set()
+        process.kill()
+
+    timer = threading.Timer(timeout, _kill_on_timeout)
+    timer.start()
+    output_lines: List[str] = []
+
+    def _stream_lines() -> Iterator[str]:
+        for raw_line in process.stdout:
+            line = raw_line[:-1] if raw_line.endswith('\n') else raw_line
+            output_lines.append(line)
+            yield line
+
+    try:
+        errors = _parse_angular_error_lines(_stream_lines())
+        returncode = process.wait()
+    finally:
+        timer.cancel()
+        # Parsing failed or was interrupted (e.g. Ctrl+C): don't leave ng running
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout, output='\n'.join(output_lines))
+
+    return returncode, '\n'.join(output_lines), errors
+
+
 def _parse_angular_errors(build_output: str) -> List[str]:
     """Parse Angular compilation errors from the output"""
+    return _parse_angular_error_lines(build_output.split('\n'))
+
+
+def _parse_angular_error_lines(lines: Iterable[str]) -> List[str]:
+    """Parse Angular compilation errors from output lines (without line endings)."""
     errors = []
-    lines = build_output.split('\n')
     
     current_error = []
     in_error_block = False
     
     # First, look for specific TypeScript/Angular errors that can appear even when the build "completes"
-    for i, line in enumerate(lines):
+    for line in lines:
         # Look for lines that indicate errors (more specific)
         # Incluir errores que empiezan con ./src/ (webpack errors)
         # Also look for "Module not found" or "Can't resolve" directly
@@ -3023,7 +3975,6 @@ def _fix_compilation_errors(errors: List[str], project_root: Path, client) -> Li
     fixes = []
     
     # First, apply automatic fixes for common missing-module errors
-    import re
     print(f"  → Analysing {len(errors)} errors for automatic fixes...")
     for i, error in enumerate(errors):
         # Buscar errores de "Module not found" o "Cannot find module"
@@ -3060,7 +4011,7 @@ def _fix_compilation_errors(errors: List[str], project_root: Path, client) -> Li
                         
                         if corrected_content != content:
                             # Aplicar inmediatamente
-                            full_path.write_text(corrected_content, encoding='utf-8')
+                            _write_source_text(full_path, corrected_content)
                             fixes.append({
                                 "path": file_path,
                                 "original": content,
@@ -3071,7 +4022,6 @@ def _fix_compilation_errors(errors: List[str], project_root: Path, client) -> Li
                             print(f"    ⚠️ No se detectaron cambios en {file_path}")
                     except Exception as e:
                         print(f"    ⚠️ Error in automatic fix: {e}")
-                        import traceback
                         traceback.print_exc()
                 else:
                     print(f"    ⚠️ Archivo no existe: {full_path}")
@@ -3120,7 +4070,6 @@ def _fix_compilation_errors(errors: List[str], project_root: Path, client) -> Li
         for line in error.split('\n'):
             # Buscar patrones de ruta de archivo en el error
             if 'src/' in line or './src/' in line or 'projects/' in line:
-                import re
                 # Patrones posibles:
                 # - src/path/to/file.ts
                 # - ./src/path/to/file.ts
@@ -3174,7 +4123,6 @@ def _fix_compilation_errors(errors: List[str], project_root: Path, client) -> Li
             
             if has_missing_module:
                 # Extract the missing module name from the error
-                import re
                 module_name = None
                 module_match = re.search(r"Can't resolve '([^']+)'|Cannot find module '([^']+)'|Module not found.*'([^']+)'", errors_text)
                 if module_match:
@@ -3261,7 +4209,6 @@ Return the full corrected code.
                 print(f"    ⚠️ No valid fix generated for {file_path}")
         except Exception as e:
             print(f"  ⚠️ Error corrigiendo {file_path}: {e}")
-            import traceback
             traceback.print_exc()
     
     return fixes
@@ -3269,7 +4216,6 @@ Return the full corrected code.
 
 def _auto_fix_missing_module(content: str, module_name: str) -> str:
     """Automatically fix a missing module by commenting out the import and removing its uses"""
-    import re
     
     lines = content.split('\n')
     corrected_lines = []
@@ -3346,11 +4292,43 @@ def _apply_compilation_fixes(fixes: List[Dict], project_root: Path) -> None:
     for fix in fixes:
         try:
             target_path = Path(fix["path"])
-            target_path.write_text(fix["corrected"], encoding="utf-8")
+            _write_source_text(target_path, fix["corrected"])
         except Exception as e:
             print(f"  ⚠️ Error applying fix to {fix['path']}: {e}")
 
 
+def _probe_dev_server(host: str, port: int, timeout: float = 1) -> bool:
+    """Return True if the dev server answers a HEAD / with a non-5xx status."""
+    conn = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        conn.request("HEAD", "/")
+        return conn.getresponse().status < 500
+    except (OSError, http.client.HTTPException):
+        return False
+    finally:
+        conn.close()
+
+
+def _wait_for_dev_server(host: str, port: int, max_wait: float) -> bool:
+    """
+    Poll the dev server until it is ready or ``max_wait`` seconds have passed.
+
+    The delay between probes starts at DEV_SERVER_POLL_INITIAL and grows by
+    half each time (capped at DEV_SERVER_POLL_MAX), so a server that comes up
+    quickly is picked up within a fraction of a second.
+    """
+    delay = DEV_SERVER_POLL_INITIAL
+    waited = 0.0
+    while waited < max_wait:
+        if _probe_dev_server(host, port):
+            return True
+        time.sleep(delay)
+        waited += delay
+        print(f"  → Esperando... ({waited:.1f}s)")
+        delay = min(delay * 1.5, DEV_SERVER_POLL_MAX)
+    return False
+
+
 def _start_angular_dev_server(project_root: Path, port: int = 4200, wait_for_ready: bool = False):
     """Inicia el servidor de desarrollo Angular (ng serve) en el puerto especificado
     
@@ -3362,7 +4340,6 @@ def _start_angular_dev_server(project_root: Path, port: int = 4200, wait_for_rea
     Returns:
         subprocess.Popen si wait_for_ready=True, None si wait_for_ready=False
     """
-    import socket
     
     # Check if the port is available
     def is_port_available(port_num: int) -> bool:
@@ -3508,7 +4485,6 @@ def _start_angular_dev_server(project_root: Path, port: int = 4200, wait_for_rea
         ng_cmd_path = str(project_root / "node_modules" / ".bin" / "ng.bat")
     elif (project_root / "node_modules" / ".bin" / "ng").exists():
         # En Windows, puede necesitar ejecutarse con cmd /c
-        import sys
         if sys.platform == "win32":
             ng_cmd_path = str(project_root / "node_modules" / ".bin" / "ng.cmd")
             if not Path(ng_cmd_path).exists():
@@ -3550,5 +4526,5 @@ def _write_if_changed(target_path: Path, new_content: Optional[str], original_co
         return False
     if new_content.strip() == original_content.strip():
         return False
-    target_path.write_text(new_content, encoding="utf-8")
+    _write_source_text(target_path, new_content)
     return True
@@ -1,8 +1,11 @@
 import json
+from operator import methodcaller
 from typing import Any, Dict, Optional
 
 from jinja2 import Environment, FileSystemLoader
 
+_get_nodes = methodcaller("get", "nodes", ())
+
 
 def generate_comparison_report(
     initial_results: Dict[str, Any],
@@ -19,11 +22,10 @@ def generate_comparison_report(
 
     def count_violations(results: Dict[str, Any], impact: Optional[str] = None) -> int:
         """Count all violating nodes, optionally filtered by impact."""
-        count = 0
-        for violation in results.get("violations", []):
-            if impact is None or violation.get("impact") == impact:
-                count += len(violation.get("nodes", []))
-        return count
+        violations = results.get("violations", [])
+        if impact is not None:
+            violations = [v for v in violations if v.get("impact") == impact]
+        return sum(map(len, map(_get_nodes, violations)))
 
     initial_total = count_violations(initial_results)
     final_total = count_violations(final_results)